@@ -1,5 +1,4 @@
 import streamlit as st
-import sqlite3
 from PIL import Image
 import numpy as np
 import pandas as pd
@@ -8,6 +7,8 @@ from streamlit_lottie import st_lottie
 import requests
 import os
 
+import auth
+
 # Streamlit page setup
 st.set_page_config(page_title="Health Dashboard", page_icon='👨‍⚕️', layout="wide")
 
@@ -24,17 +25,6 @@ def load_lottieurl(url: str):
 # Lottie animations
 lottie_health = load_lottieurl("https://assets10.lottiefiles.com/packages/lf20_0fy1spgt.json")
 
-# Database connection
-conn = sqlite3.connect('user_data.db', check_same_thread=False)
-c = conn.cursor()
-
-# Create tables if not exist
-c.execute('''CREATE TABLE IF NOT EXISTS users
-             (username TEXT, password TEXT, age INTEGER, weight INTEGER, height INTEGER)''')
-c.execute('''CREATE TABLE IF NOT EXISTS medical_data
-             (username TEXT, file_name TEXT, file_type TEXT, file_path TEXT)''')
-conn.commit()
-
 # Background image CSS
 background_image_url = "https://www.google.com/url?sa=i&url=https%3A%2F%2Fwww.jabil.com%2Findustries%2Fhealthcare.html&psig=AOvVaw3sCxOLEWfOl1BX0c2vEZwR&ust=1729462260468000&source=images&cd=vfe&opi=89978449&ved=0CBQQjRxqFwoTCKDKspG7m4kDFQAAAAAdAAAAABAZ"  # Replace with your image URL or local image path
 st.markdown(
@@ -70,8 +60,7 @@ def login_page():
         
         if login_btn:
             if username and password:
-                c.execute("SELECT * FROM users WHERE username = ? AND password = ?", (username, password))
-                user_data = c.fetchone()
+                user_data = auth.login(username, password)
                 if user_data:
                     st.session_state['logged_in'] = True
                     st.session_state['username'] = username
@@ -94,10 +83,10 @@ def login_page():
         
         if register_btn:
             if username and password and age and weight and height:
-                c.execute("INSERT INTO users (username, password, age, weight, height) VALUES (?, ?, ?, ?, ?)", 
-                          (username, password, age, weight, height))
-                conn.commit()
-                st.success("You have successfully created an account. Go to the Login Menu to login.")
+                if auth.register(username, password, age, weight, height):
+                    st.success("You have successfully created an account. Go to the Login Menu to login.")
+                else:
+                    st.error("That username is already taken. Please choose another one.")
             else:
                 st.warning("Please fill in all the fields.")
 
@@ -111,7 +100,7 @@ else:
     # Show the main dashboard
     username = st.session_state['username']
     user_data = st.session_state['user_data']
-    age, weight, height = user_data[2], user_data[3], user_data[4]
+    age, weight, height = user_data.age, user_data.weight, user_data.height
 
     # Calculate BMI
     bmi = round(weight / ((height / 100) ** 2), 2)
@@ -0,0 +1,12 @@
+import os
+
+# Single place that knows where the app's models and data files live.
+# Paths are resolved relative to this directory, so the app and the scripts
+# work no matter which directory they are started from.
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def asset_path(*parts):
+    """Return the absolute path of a file under the app directory, e.g. asset_path("models", "svc")."""
+    return os.path.join(BASE_DIR, *parts)
@@ -0,0 +1,99 @@
+import hashlib
+import hmac
+import os
+import secrets
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+import db
+
+# Password hashing and login for the Dashboard.
+# Passwords are stored as salted PBKDF2-SHA256 hashes in the form
+#   pbkdf2_sha256$<iterations>$<salt hex>$<hash hex>
+# so the cost can be raised later without invalidating existing accounts:
+# hashes made with an older cost are upgraded the next time the user logs in.
+# All hashing goes through a worker pool sized to the CPU count. That only
+# caps how many hashes run at once, so a burst of logins queues instead of
+# oversubscribing the CPUs; the calling session still waits for its result.
+
+ALGORITHM = 'pbkdf2_sha256'
+# Iterations of PBKDF2; override with MEDILINK_KDF_ITERATIONS.
+# benchmark_auth.py reports what each setting costs in logins per second.
+KDF_ITERATIONS = int(os.environ.get('MEDILINK_KDF_ITERATIONS', 600_000))
+SALT_BYTES = 16
+
+_executor = ThreadPoolExecutor(max_workers=os.cpu_count(), thread_name_prefix='auth')
+_dummy_hash = None
+_lock = threading.Lock()
+
+
+def hash_password(password: str, iterations: Optional[int] = None) -> str:
+    iterations = iterations or KDF_ITERATIONS
+    salt = secrets.token_bytes(SALT_BYTES)
+    digest = hashlib.pbkdf2_hmac('sha256', password.encode(), salt, iterations)
+    return f"{ALGORITHM}${iterations}${salt.hex()}${digest.hex()}"
+
+
+def verify_password(password: str, encoded: str) -> bool:
+    algorithm, iterations, salt, digest = encoded.split('$')
+    if algorithm != ALGORITHM:
+        raise ValueError(f"Unknown password hash algorithm: {algorithm}")
+    candidate = hashlib.pbkdf2_hmac('sha256', password.encode(), bytes.fromhex(salt), int(iterations))
+    return hmac.compare_digest(candidate, bytes.fromhex(digest))
+
+
+def needs_rehash(encoded: str, iterations: Optional[int] = None) -> bool:
+    return not encoded.startswith(f"{ALGORITHM}${iterations or KDF_ITERATIONS}$")
+
+
+def _get_dummy_hash():
+    # Verified against when the username doesn't exist, so a failed login takes
+    # as long whether or not the account exists. Made on first use rather than
+    # at import, which would cost every process a full hash.
+    global _dummy_hash
+    if _dummy_hash is not None:
+        return _dummy_hash
+
+    with _lock:
+        if _dummy_hash is None:
+            _dummy_hash = hash_password(secrets.token_hex(SALT_BYTES))
+    return _dummy_hash
+
+
+def _login(username, password, path):
+    found = db.get_user(username, path)
+    if found is None:
+        verify_password(password, _get_dummy_hash())
+        return None
+
+    user, stored = found
+    if not stored.startswith(ALGORITHM + '$'):
+        # Account created before passwords were hashed
+        if not hmac.compare_digest(stored.encode(), password.encode()):
+            return None
+    elif not verify_password(password, stored):
+        return None
+
+    if needs_rehash(stored):
+        db.set_password_hash(username, hash_password(password), path)
+    return user
+
+
+def login_async(username: str, password: str, path=db.DB_PATH):
+    """Start verifying a login on the worker pool; the future resolves to the User or None."""
+    return _executor.submit(_login, username, password, path)
+
+
+def login(username: str, password: str, path=db.DB_PATH) -> Optional[db.User]:
+    """Return the user's profile if the credentials are valid, else None.
+
+    Blocks until the pool has verified the password.
+    """
+    return login_async(username, password, path).result()
+
+
+def register(username: str, password: str, age: int, weight: int, height: int, path=db.DB_PATH) -> bool:
+    """Create an account, returning False if the username is already taken."""
+    password_hash = _executor.submit(hash_password, password).result()
+    return db.create_user(username, password_hash, age, weight, height, path)
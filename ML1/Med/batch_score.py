@@ -0,0 +1,37 @@
+import argparse
+
+import pandas as pd
+
+import clinical_models
+
+# Score a CSV of patients with the diabetes, heart or kidney model.
+# The input is read and written in chunks, so memory use doesn't grow with
+# the file size.
+#
+#   python batch_score.py diabetes patients.csv predictions.csv
+
+
+def score_csv(name, input_path, output_path, chunksize=10000):
+    rows = 0
+    with pd.read_csv(input_path, chunksize=chunksize) as reader:
+        for i, chunk in enumerate(reader):
+            chunk['prediction'] = clinical_models.predict(name, chunk)
+            chunk.to_csv(output_path, mode='w' if i == 0 else 'a', header=i == 0, index=False)
+            rows += len(chunk)
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batch score patients with the diabetes, heart or kidney model.")
+    parser.add_argument('model', choices=sorted(clinical_models.MODELS))
+    parser.add_argument('input', help="CSV with one column per model input")
+    parser.add_argument('output', help="where to write the input rows with a prediction column")
+    parser.add_argument('--chunksize', type=int, default=10000)
+    args = parser.parse_args()
+
+    rows = score_csv(args.model, args.input, args.output, args.chunksize)
+    print(f"Scored {rows} rows with the {args.model} model")
+
+
+if __name__ == '__main__':
+    main()
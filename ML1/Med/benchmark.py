@@ -0,0 +1,205 @@
+import argparse
+import json
+import platform
+import time
+
+import numpy as np
+import pandas as pd
+
+import breast_cancer
+import clinical_models
+import model_registry
+import recommender
+from assets import asset_path
+
+# Inference benchmarks for every predictor in the app.
+# For each model this measures the cold load time, single-row latency
+# percentiles and batch throughput on synthetic inputs, and writes the
+# results as JSON so runs can be compared after retraining.
+#
+#   python benchmark.py --output benchmark_results.json
+
+BATCH_SIZES = (1, 10, 100, 1000)
+
+
+def resample_columns(table, rows, rng):
+    """Synthetic rows: every column is sampled independently from its observed values."""
+    columns = []
+    for name in table.columns:
+        values = table[name].dropna()
+        if not pd.api.types.is_numeric_dtype(values):
+            values = pd.Series(pd.factorize(values.str.strip())[0])
+        columns.append(rng.choice(values.to_numpy(dtype=float), size=rows))
+    return np.column_stack(columns)
+
+
+def breast_cancer_inputs(rows, rng):
+    data = pd.read_csv(asset_path("data", "data.csv")).drop(['Unnamed: 32', 'id', 'diagnosis'], axis=1)
+    return resample_columns(data, rows, rng)
+
+
+def diabetes_inputs(rows, rng):
+    data = pd.read_csv(asset_path("dataset", "diabetes.csv"))
+    return resample_columns(data[clinical_models.DIABETES_COLUMNS], rows, rng)
+
+
+def heart_inputs(rows, rng):
+    data = pd.read_csv(asset_path("dataset", "heart.csv"), encoding='utf-8-sig')
+    return resample_columns(data[clinical_models.HEART_COLUMNS], rows, rng)
+
+
+def kidney_inputs(rows, rng):
+    # Same column order as the model inputs, categorical values label encoded.
+    # pcv, wc and rc are numeric but contain stray text like '\t?'.
+    data = pd.read_csv(asset_path("dataset", "kidney_disease.csv")).drop(['id', 'classification'], axis=1)
+    for name in ('pcv', 'wc', 'rc'):
+        data[name] = pd.to_numeric(data[name], errors='coerce')
+    return resample_columns(data, rows, rng)
+
+
+def symptom_inputs(rows, rng):
+    # Training rows with a random subset of their symptoms switched off
+    data = pd.read_csv(asset_path("datasets", "Training.csv")).drop('prognosis', axis=1).to_numpy()
+    X = data[rng.integers(0, len(data), size=rows)]
+    return X * (rng.random(X.shape) < 0.7)
+
+
+def xray_inputs(rows, rng):
+    import pneumonia
+    return rng.integers(0, 256, size=(rows,) + pneumonia.IMAGE_SIZE + (3,)).astype(np.float32)
+
+
+def _load_pneumonia():
+    import pneumonia
+    pneumonia._model = None
+    return pneumonia.get_model()
+
+
+def _load_pneumonia_tflite():
+    import pneumonia
+    return pneumonia.TFLiteModel(pneumonia.TFLITE_PATH)
+
+
+# name -> (load, predict(model, X), inputs(rows, rng))
+PREDICTORS = {
+    'breast_cancer': (
+        lambda: (model_registry.load_model(breast_cancer.MODEL_PATH, loader="pickle"),
+                 model_registry.load_model(breast_cancer.SCALER_PATH, loader="pickle")),
+        lambda model, X: breast_cancer.predict_pipeline(X),
+        breast_cancer_inputs,
+    ),
+    'breast_cancer_fused': (
+        lambda: model_registry.load_model(breast_cancer.FUSED_MODEL_PATH, loader=breast_cancer._read_fused_model),
+        lambda model, X: breast_cancer.predict_fused(X),
+        breast_cancer_inputs,
+    ),
+    'diabetes': (
+        lambda: model_registry.load_model(clinical_models.DIABETES_MODEL_PATH),
+        lambda model, X: clinical_models.predict('diabetes', X),
+        diabetes_inputs,
+    ),
+    'heart': (
+        lambda: model_registry.load_model(clinical_models.HEART_MODEL_PATH),
+        lambda model, X: clinical_models.predict('heart', X),
+        heart_inputs,
+    ),
+    'kidney': (
+        lambda: model_registry.load_model(clinical_models.KIDNEY_MODEL_PATH),
+        lambda model, X: clinical_models.predict('kidney', X),
+        kidney_inputs,
+    ),
+    'symptom_svc': (
+        recommender.load_symptom_model,
+        lambda model, X: recommender.class_scores(model, X),
+        symptom_inputs,
+    ),
+    'pneumonia_vgg19': (
+        _load_pneumonia,
+        lambda model, X: model.predict_on_batch(X),
+        xray_inputs,
+    ),
+    'pneumonia_tflite': (
+        _load_pneumonia_tflite,
+        lambda model, X: model.predict_on_batch(X),
+        xray_inputs,
+    ),
+}
+
+
+def bench_predictor(load, predict, make_inputs, single_runs=200, batch_sizes=BATCH_SIZES, seed=42):
+    rng = np.random.default_rng(seed)
+
+    model_registry.clear()
+    start = time.perf_counter()
+    model = load()
+    cold_load = time.perf_counter() - start
+
+    # warm up once so one-off initialisation isn't counted as latency
+    X = make_inputs(single_runs, rng)
+    predict(model, X[:1])
+
+    latencies = []
+    for i in range(single_runs):
+        start = time.perf_counter()
+        predict(model, X[i:i + 1])
+        latencies.append(time.perf_counter() - start)
+
+    throughput = {}
+    for size in batch_sizes:
+        X = make_inputs(size, rng)
+        runs = []
+        for _ in range(3):
+            start = time.perf_counter()
+            predict(model, X)
+            runs.append(time.perf_counter() - start)
+        throughput[str(size)] = size / min(runs)
+
+    return {
+        'cold_load_ms': 1000 * cold_load,
+        'latency_ms': {
+            'p50': 1000 * float(np.percentile(latencies, 50)),
+            'p95': 1000 * float(np.percentile(latencies, 95)),
+            'p99': 1000 * float(np.percentile(latencies, 99)),
+        },
+        'rows_per_second': throughput,
+    }
+
+
+def run(names, single_runs, batch_sizes):
+    results = {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'predictors': {},
+    }
+    for name in names:
+        load, predict, make_inputs = PREDICTORS[name]
+        try:
+            results['predictors'][name] = bench_predictor(load, predict, make_inputs, single_runs, batch_sizes)
+        except Exception as e:
+            # e.g. TensorFlow not installed, or a model pickled by another sklearn version
+            results['predictors'][name] = {'error': f"{type(e).__name__}: {e}"}
+        print(name, json.dumps(results['predictors'][name]))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the app's predictors.")
+    parser.add_argument('predictors', nargs='*',
+                        help=f"predictors to run (default: all): {', '.join(PREDICTORS)}")
+    parser.add_argument('--output', default='benchmark_results.json')
+    parser.add_argument('--single-runs', type=int, default=200)
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=list(BATCH_SIZES))
+    args = parser.parse_args()
+    unknown = set(args.predictors) - set(PREDICTORS)
+    if unknown:
+        parser.error(f"unknown predictors: {', '.join(sorted(unknown))}")
+
+    results = run(args.predictors or list(PREDICTORS), args.single_runs, args.batch_sizes)
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"Wrote {args.output}")
+
+
+if __name__ == '__main__':
+    main()
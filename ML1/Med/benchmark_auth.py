@@ -0,0 +1,74 @@
+import argparse
+import json
+import os
+import platform
+import tempfile
+import time
+
+import auth
+import db
+
+# Login throughput at each KDF cost, to pick auth.KDF_ITERATIONS for a host.
+# Logins run through auth.login_async against a throwaway database, with
+# every worker busy, so the numbers include the user lookup as well as hashing.
+#
+#   python benchmark_auth.py --iterations 100000 300000 600000
+
+DEFAULT_ITERATIONS = (100_000, 300_000, 600_000, 1_000_000)
+
+
+def bench_cost(iterations, logins, path):
+    username = f"bench-{iterations}"
+    db.create_user(username, auth.hash_password('secret', iterations), 30, 70, 175, path)
+
+    # Keep the stored hash at this cost instead of upgrading it on first login
+    default, auth.KDF_ITERATIONS = auth.KDF_ITERATIONS, iterations
+    try:
+        start = time.perf_counter()
+        futures = [auth.login_async(username, 'secret', path) for _ in range(logins)]
+        ok = sum(f.result() is not None for f in futures)
+        elapsed = time.perf_counter() - start
+    finally:
+        auth.KDF_ITERATIONS = default
+
+    if ok != logins:
+        raise RuntimeError(f"only {ok} of {logins} logins succeeded")
+    cores = auth._executor._max_workers
+    return {
+        'login_ms': 1000 * elapsed * cores / logins,
+        'logins_per_second': logins / elapsed,
+        'logins_per_second_per_core': logins / elapsed / cores,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark login throughput for each KDF cost.")
+    parser.add_argument('--iterations', type=int, nargs='+', default=list(DEFAULT_ITERATIONS))
+    parser.add_argument('--logins', type=int, default=None,
+                        help="logins per cost (default: 8 per core)")
+    parser.add_argument('--output', default='benchmark_auth.json')
+    args = parser.parse_args()
+
+    cores = auth._executor._max_workers
+    logins = args.logins or 8 * cores
+    results = {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'python': platform.python_version(),
+        'cores': cores,
+        'logins': logins,
+        'iterations': {},
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'bench.db')
+        for iterations in args.iterations:
+            results['iterations'][str(iterations)] = bench_cost(iterations, logins, path)
+            print(iterations, json.dumps(results['iterations'][str(iterations)]))
+        db.close_all()
+
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"Wrote {args.output}")
+
+
+if __name__ == '__main__':
+    main()
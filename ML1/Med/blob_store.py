@@ -0,0 +1,67 @@
+import hashlib
+import os
+import tempfile
+
+from assets import asset_path
+
+# Content-addressed storage for uploaded medical files.
+# A file is stored once under the SHA-256 of its bytes, sharded two levels
+# deep (blobs/ab/cd/abcd...) so no directory grows too large. Uploads are
+# first streamed to a temporary file in the store, hashing as they go, and
+# then renamed into place, so concurrent uploads never see a partial file
+# and identical files end up as the same blob. Which records use a blob is
+# tracked by content_hash in medical_data (see records.py).
+
+BLOB_DIR = asset_path("blobs")
+CHUNK_SIZE = 1 << 20
+
+
+def blob_path(digest, root=BLOB_DIR):
+    return os.path.join(root, digest[:2], digest[2:4], digest)
+
+
+def write_temp(buffer, root=BLOB_DIR, chunk_size=CHUNK_SIZE):
+    """Stream `buffer` (e.g. uploaded_file.getbuffer()) into a temporary file in the store.
+
+    The buffer is written in slices of a memoryview, so it is never copied as
+    a whole. Returns (temp path, SHA-256 hex digest, size in bytes).
+    """
+    os.makedirs(root, exist_ok=True)
+    view = memoryview(buffer).cast('B')
+    digest = hashlib.sha256()
+
+    fd, tmp_path = tempfile.mkstemp(dir=root, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            for start in range(0, len(view), chunk_size):
+                chunk = view[start:start + chunk_size]
+                digest.update(chunk)
+                f.write(chunk)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return tmp_path, digest.hexdigest(), len(view)
+
+
+def commit(tmp_path, digest, root=BLOB_DIR):
+    """Move a temporary file written by write_temp into place, or drop it if the blob already exists."""
+    path = blob_path(digest, root)
+    if os.path.exists(path):
+        os.unlink(tmp_path)
+    else:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        os.replace(tmp_path, path)
+    return path
+
+
+def discard(tmp_path):
+    if os.path.exists(tmp_path):
+        os.unlink(tmp_path)
+
+
+def remove(digest, root=BLOB_DIR):
+    """Delete a blob; callers must have checked nothing references it any more."""
+    try:
+        os.unlink(blob_path(digest, root))
+    except FileNotFoundError:
+        pass
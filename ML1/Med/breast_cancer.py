@@ -0,0 +1,64 @@
+import json
+import os
+
+import numpy as np
+
+from assets import asset_path
+from model_registry import load_model
+
+# Breast cancer inference, shared by the Streamlit page and headless scripts.
+
+MODEL_PATH = asset_path("model", "model.pkl")
+SCALER_PATH = asset_path("model", "scaler.pkl")
+FUSED_MODEL_PATH = asset_path("model", "model_fused.json")
+FEATURE_STATS_PATH = asset_path("model", "feature_stats.json")
+
+
+def _read_fused_model(f):
+    fused = json.load(f)
+    return np.array(fused['weights']), fused['bias'], np.array(fused['classes'])
+
+
+def predict_fused(features):
+    """Score rows with the fused scaler + logistic regression (numpy only).
+
+    Same return value as predict(), computed as one dot product and a sigmoid.
+    """
+    weights, bias, classes = load_model(FUSED_MODEL_PATH, loader=_read_fused_model)
+
+    X = np.asarray(features, dtype=float)
+    if X.ndim == 1:
+        X = X.reshape(1, -1)
+
+    malignant = 1 / (1 + np.exp(-(X @ weights + bias)))
+    probabilities = np.column_stack([1 - malignant, malignant])
+    return classes[(malignant > 0.5).astype(int)], probabilities
+
+
+def predict(features):
+    """Score one row or a 2-D array of rows of the 30 cell nuclei features.
+
+    Returns (labels, probabilities) where probabilities[:, 1] is malignant.
+    Uses the fused model written by model/main.py when there is one.
+    """
+    if os.path.exists(FUSED_MODEL_PATH):
+        return predict_fused(features)
+    return predict_pipeline(features)
+
+
+def predict_pipeline(features):
+    """Score rows with the pickled scaler and model.
+
+    Runs the model once via predict_proba and takes the label from the
+    argmax, so the label and the probabilities always agree.
+    """
+    model = load_model(MODEL_PATH, loader="pickle")
+    scaler = load_model(SCALER_PATH, loader="pickle")
+
+    X = np.asarray(features, dtype=float)
+    if X.ndim == 1:
+        X = X.reshape(1, -1)
+
+    probabilities = model.predict_proba(scaler.transform(X))
+    labels = model.classes_[np.argmax(probabilities, axis=1)]
+    return labels, probabilities
@@ -0,0 +1,93 @@
+import numpy as np
+
+from assets import asset_path
+from model_registry import load_model
+
+# Diabetes, heart and kidney disease models, shared by the Streamlit page and
+# batch scoring. Input columns are named after the fields of the prediction
+# forms and use the same numeric encodings.
+
+DIABETES_MODEL_PATH = asset_path("models", "diabetes_new.pkl")
+HEART_MODEL_PATH = asset_path("models", "heart_new.pkl")
+KIDNEY_MODEL_PATH = asset_path("models", "kidney_new.pkl")
+
+DIABETES_COLUMNS = [
+    'Pregnancies', 'Glucose', 'BloodPressure', 'SkinThickness', 'Insulin',
+    'BMI', 'DiabetesPedigreeFunction', 'Age',
+]
+
+HEART_COLUMNS = [
+    'age', 'sex', 'cp', 'trestbps', 'chol', 'fbs', 'restecg', 'thalach',
+    'exang', 'oldpeak', 'slope', 'ca', 'thal',
+]
+
+KIDNEY_COLUMNS = [
+    'age', 'blood_pressure', 'specific_gravity', 'albumin', 'sugar',
+    'red_blood_cells', 'pus_cell', 'pus_cell_clumps', 'bacteria',
+    'blood_glucose_random', 'blood_urea', 'serum_creatinine', 'sodium',
+    'potassium', 'haemoglobin', 'packed_cell_volume',
+    'white_blood_cell_count', 'red_blood_cell_count', 'hypertension',
+    'diabetes_mellitus', 'coronary_artery_disease', 'appetite',
+    'peda_edema', 'aanemia',
+]
+
+
+DIABETES_FLAG_COLUMNS = [
+    'NewBMI_Underweight', 'NewBMI_Overweight', 'NewBMI_Obesity_1',
+    'NewBMI_Obesity_2', 'NewBMI_Obesity_3', 'NewInsulinScore_Normal',
+    'NewGlucose_Low', 'NewGlucose_Normal', 'NewGlucose_Overweight',
+    'NewGlucose_Secret',
+]
+
+# Upper (inclusive) bounds of the BMI and glucose categories
+BMI_BINS = np.array([18.5, 24.9, 29.9, 34.9, 39.9])
+GLUCOSE_BINS = np.array([70, 99, 126])
+
+# Category -> one-hot flags. Normal BMI has no flag of its own, and the
+# last row (all zeros) is used for missing values.
+_BMI_FLAGS = np.vstack([np.eye(6)[:, [0, 2, 3, 4, 5]], np.zeros(5)])
+_GLUCOSE_FLAGS = np.vstack([np.eye(4), np.zeros(4)])
+
+
+def _categorize(values, bins):
+    categories = np.digitize(values, bins, right=True)
+    categories[np.isnan(values)] = -1
+    return categories
+
+
+def diabetes_features(X):
+    """Append the BMI, insulin and glucose category flags to the raw diabetes columns.
+
+    Works on a single row or a 2-D array of rows in DIABETES_COLUMNS order and
+    returns the 18 features the diabetes model was trained on.
+    """
+    X = np.atleast_2d(np.asarray(X, dtype=float))
+    glucose, insulin, bmi = X[:, 1], X[:, 4], X[:, 5]
+
+    insulin_normal = ((16 <= insulin) & (insulin <= 166))[:, None]
+    return np.hstack([
+        X,
+        _BMI_FLAGS[_categorize(bmi, BMI_BINS)],
+        insulin_normal,
+        _GLUCOSE_FLAGS[_categorize(glucose, GLUCOSE_BINS)],
+    ])
+
+
+def _as_float(X):
+    return np.asarray(X, dtype=float)
+
+
+# name -> (model path, input columns, feature function)
+MODELS = {
+    'diabetes': (DIABETES_MODEL_PATH, DIABETES_COLUMNS, diabetes_features),
+    'heart': (HEART_MODEL_PATH, HEART_COLUMNS, _as_float),
+    'kidney': (KIDNEY_MODEL_PATH, KIDNEY_COLUMNS, _as_float),
+}
+
+
+def predict(name, rows):
+    """Predict for a DataFrame with the model's input columns (or an array in that order)."""
+    path, columns, features = MODELS[name]
+    if hasattr(rows, 'columns'):
+        rows = rows[columns].to_numpy()
+    return load_model(path).predict(features(rows))
@@ -0,0 +1,191 @@
+import queue
+import sqlite3
+import threading
+from collections import namedtuple
+from contextlib import contextmanager
+from typing import Optional
+
+import migrations
+from assets import asset_path
+
+# Data access for user_data.db, shared by the Dashboard and the Reports page.
+# Each Streamlit session runs on its own thread, so instead of one global
+# cursor every call checks a connection out of a small pool and has it to
+# itself until it is returned. The database runs in WAL mode, so readers never
+# wait for a writer and logins and uploads from different sessions proceed in
+# parallel; only concurrent writers are serialized by SQLite itself.
+
+DB_PATH = asset_path("user_data.db")
+POOL_SIZE = 8
+# How long a writer waits for another writer's lock before giving up
+BUSY_TIMEOUT_S = 5.0
+
+User = namedtuple('User', ['username', 'age', 'weight', 'height'])
+Record = namedtuple('Record', ['id', 'file_name', 'file_type', 'file_path', 'file_size', 'uploaded_at'])
+
+_pools = {}
+_initialized = set()
+_lock = threading.Lock()
+
+
+def _connect(path):
+    # check_same_thread=False because a pooled connection may be checked out by
+    # a different thread each time; the pool guarantees one user at a time
+    conn = sqlite3.connect(path, timeout=BUSY_TIMEOUT_S, check_same_thread=False)
+    conn.execute('PRAGMA journal_mode=WAL')
+    # In WAL mode NORMAL only syncs at checkpoints and is still corruption safe
+    conn.execute('PRAGMA synchronous=NORMAL')
+
+    # The first connection of the process brings the schema up to date
+    with _lock:
+        if path not in _initialized:
+            migrations.migrate(conn)
+            _initialized.add(path)
+    return conn
+
+
+@contextmanager
+def connection(path=DB_PATH):
+    """Check a connection out of the pool for the duration of the block."""
+    pool = _pools.get(path)
+    if pool is None:
+        with _lock:
+            pool = _pools.setdefault(path, queue.LifoQueue(maxsize=POOL_SIZE))
+
+    try:
+        conn = pool.get_nowait()
+    except queue.Empty:
+        conn = _connect(path)
+
+    try:
+        yield conn
+    finally:
+        if conn.in_transaction:
+            conn.rollback()
+        try:
+            pool.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+
+@contextmanager
+def transaction(path=DB_PATH):
+    """Run several writes as one transaction, committed once at the end."""
+    with connection(path) as conn:
+        with conn:
+            yield conn
+
+
+def close_all():
+    """Close every idle pooled connection (mainly useful for tests and benchmarks)."""
+    with _lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        while True:
+            try:
+                pool.get_nowait().close()
+            except queue.Empty:
+                break
+
+
+def create_user(username: str, password_hash: str, age: int, weight: int, height: int, path=DB_PATH) -> bool:
+    """Add a user, returning False if the username is already taken.
+
+    Passwords are hashed by the auth module, this only stores the result.
+    """
+    try:
+        with transaction(path) as conn:
+            conn.execute("INSERT INTO users (username, password, age, weight, height) VALUES (?, ?, ?, ?, ?)",
+                         (username, password_hash, age, weight, height))
+    except sqlite3.IntegrityError:
+        return False
+    return True
+
+
+def get_user(username: str, path=DB_PATH) -> Optional[tuple[User, str]]:
+    """Return the user's profile and stored password hash, or None if there is no such user."""
+    with connection(path) as conn:
+        row = conn.execute("SELECT username, age, weight, height, password FROM users WHERE username = ?",
+                           (username,)).fetchone()
+    return (User(*row[:4]), row[4]) if row else None
+
+
+def set_password_hash(username: str, password_hash: str, path=DB_PATH) -> None:
+    with transaction(path) as conn:
+        conn.execute("UPDATE users SET password = ? WHERE username = ?", (password_hash, username))
+
+
+def add_record(username: str, file_name: str, file_type: str, file_path: str,
+               file_size: int, content_hash: str, path=DB_PATH) -> None:
+    add_records([(username, file_name, file_type, file_path, file_size, content_hash)], path)
+
+
+def add_records(records, path=DB_PATH) -> None:
+    """Insert many (username, file_name, file_type, file_path, file_size, content_hash) rows with a single commit."""
+    with transaction(path) as conn:
+        insert_records(conn, records)
+
+
+def insert_records(conn: sqlite3.Connection, records) -> None:
+    """Like add_records, inside a transaction the caller controls."""
+    conn.executemany('''INSERT INTO medical_data (username, file_name, file_type, file_path, file_size, content_hash)
+                        VALUES (?, ?, ?, ?, ?, ?)''', records)
+
+
+def delete_record(conn: sqlite3.Connection, username: str, record_id: int) -> Optional[str]:
+    """Delete one of the user's records, returning its content hash (None for files stored before hashing)."""
+    row = conn.execute("SELECT content_hash FROM medical_data WHERE id = ? AND username = ?",
+                       (record_id, username)).fetchone()
+    conn.execute("DELETE FROM medical_data WHERE id = ? AND username = ?", (record_id, username))
+    return row[0] if row else None
+
+
+def count_references(conn: sqlite3.Connection, content_hash: str) -> int:
+    return conn.execute("SELECT COUNT(*) FROM medical_data WHERE content_hash = ?", (content_hash,)).fetchone()[0]
+
+
+def list_records(username: str, path=DB_PATH) -> list[Record]:
+    """The user's records, oldest first (answered from the covering index alone)."""
+    with connection(path) as conn:
+        rows = conn.execute('''SELECT id, file_name, file_type, file_path, file_size, uploaded_at
+                               FROM medical_data WHERE username = ? ORDER BY uploaded_at, id''',
+                            (username,)).fetchall()
+    return [Record(*row) for row in rows]
+
+
+def list_records_page(username: str, before: Optional[tuple[str, int]] = None, limit: int = 20,
+                      path=DB_PATH) -> list[Record]:
+    """One page of the user's records, newest first.
+
+    Pages are addressed by keyset: pass the (uploaded_at, id) of the last record
+    of the previous page as `before`. Each page is a seek into the covering
+    index, so it costs the same however many records come before it.
+    """
+    where, params = "username = ?", (username,)
+    if before is not None:
+        where, params = "username = ? AND (uploaded_at, id) < (?, ?)", (username, *before)
+    with connection(path) as conn:
+        rows = conn.execute(f'''SELECT id, file_name, file_type, file_path, file_size, uploaded_at
+                                FROM medical_data WHERE {where}
+                                ORDER BY uploaded_at DESC, id DESC LIMIT ?''',
+                            params + (limit,)).fetchall()
+    return [Record(*row) for row in rows]
+
+
+# SELECT DISTINCT would read every index entry. Seeking straight to the next
+# larger username costs one index lookup per distinct user instead, however
+# many records each of them has.
+_USERNAMES_SQL = '''
+    WITH RECURSIVE names(username) AS (
+        SELECT MIN(username) FROM medical_data
+        UNION ALL
+        SELECT (SELECT MIN(username) FROM medical_data WHERE username > names.username)
+        FROM names WHERE names.username IS NOT NULL
+    )
+    SELECT username FROM names WHERE username IS NOT NULL'''
+
+
+def list_usernames(path=DB_PATH) -> list[str]:
+    with connection(path) as conn:
+        return [row[0] for row in conn.execute(_USERNAMES_SQL)]
@@ -0,0 +1,84 @@
+import argparse
+import json
+import os
+import tempfile
+
+import numpy as np
+
+import pneumonia
+
+# Export the pneumonia model to a quantized TFLite file for CPU inference and
+# check that it still makes the same calls as the Keras model. The export is
+# written to a temporary file and only replaces --output once it agrees with
+# Keras on real chest X-rays; from then on the app serves predictions from it
+# instead of Keras.
+#
+#   python export_pneumonia_tflite.py --images path/to/xrays
+#
+# Without --images the parity check runs on random noise, which only shows the
+# export is wired correctly, so nothing is deployed.
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png')
+
+
+def load_images(directory):
+    """Preprocess every image under `directory` into one (n, 128, 128, 3) batch."""
+    paths = sorted(
+        os.path.join(root, name)
+        for root, _, names in os.walk(directory)
+        for name in names if name.lower().endswith(IMAGE_EXTENSIONS)
+    )
+    inputs = np.empty((len(paths),) + pneumonia.IMAGE_SIZE + (3,), dtype=np.float32)
+    for path, out in zip(paths, inputs):
+        with open(path, 'rb') as f:
+            pneumonia.preprocess(f.read(), out=out[np.newaxis])
+    return paths, inputs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the pneumonia model to quantized TFLite.")
+    parser.add_argument('--output', default=pneumonia.TFLITE_PATH)
+    parser.add_argument('--quantization', choices=['float16', 'int8'], default='float16')
+    parser.add_argument('--images', help="directory of chest X-rays for the parity check")
+    parser.add_argument('--samples', type=int, default=64,
+                        help="number of random images to check when --images is not given")
+    parser.add_argument('--min-agreement', type=float, default=0.99)
+    args = parser.parse_args()
+
+    if args.images:
+        paths, inputs = load_images(args.images)
+        if not len(paths):
+            parser.error(f"no images found in {args.images}")
+    else:
+        print("No --images given, checking parity on random noise without deploying")
+        rng = np.random.default_rng(42)
+        paths = None
+        inputs = rng.integers(0, 256, size=(args.samples,) + pneumonia.IMAGE_SIZE + (3,)).astype(np.float32)
+
+    keras_model = pneumonia.get_model()
+    # Same directory as the output, so os.replace is an atomic rename
+    fd, candidate_path = tempfile.mkstemp(suffix='.tflite', dir=os.path.dirname(os.path.abspath(args.output)))
+    os.close(fd)
+    try:
+        pneumonia.export_tflite(keras_model, candidate_path, args.quantization)
+        print(f"Exported {args.quantization} model ({os.path.getsize(candidate_path) / 2**20:.1f} MiB)")
+
+        report = pneumonia.check_parity(inputs, keras_model, pneumonia.TFLiteModel(candidate_path))
+        if paths is not None:
+            report['disagreements'] = [paths[i] for i in report['disagreements']]
+        print(json.dumps(report, indent=2))
+
+        if report['agreement'] < args.min_agreement:
+            raise SystemExit(f"Agreement {report['agreement']:.2%} is below {args.min_agreement:.2%}, "
+                             f"{args.output} was not changed")
+        if paths is None:
+            return
+
+        os.replace(candidate_path, args.output)
+        print(f"Wrote {args.quantization} model to {args.output}")
+    finally:
+        if os.path.exists(candidate_path):
+            os.remove(candidate_path)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+import sqlite3
+
+# Schema migrations for user_data.db.
+# The schema version lives in SQLite's user_version pragma and every migration
+# runs in its own transaction together with the version bump, so running
+# migrate() again (or from several processes at once) is a no-op once the
+# database is current. Append new migrations to MIGRATIONS; never edit one
+# that has shipped.
+
+
+def _initial_schema(conn):
+    conn.execute('''CREATE TABLE IF NOT EXISTS users
+                    (username TEXT, password TEXT, age INTEGER, weight INTEGER, height INTEGER)''')
+    conn.execute('''CREATE TABLE IF NOT EXISTS medical_data
+                    (username TEXT, file_name TEXT, file_type TEXT, file_path TEXT)''')
+
+
+def _unique_usernames(conn):
+    # Registration used to allow duplicate usernames. The oldest account keeps
+    # the name; later ones are renamed to 'name#<rowid>' rather than deleted,
+    # so nobody loses their login. Their medical_data rows can't be told apart
+    # and stay under the original name.
+    conn.execute('''UPDATE users SET username = username || '#' || rowid
+                    WHERE rowid NOT IN (SELECT MIN(rowid) FROM users GROUP BY username)''')
+    conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS users_username ON users (username)")
+
+
+def _medical_data_keys(conn):
+    # SQLite can't add a primary key to an existing table, so rebuild it.
+    # Rows from before this migration get the migration time as uploaded_at
+    # and no size or hash, since the files may no longer exist.
+    conn.execute('''CREATE TABLE medical_data_new (
+                        id INTEGER PRIMARY KEY,
+                        username TEXT NOT NULL,
+                        file_name TEXT NOT NULL,
+                        file_type TEXT,
+                        file_path TEXT NOT NULL,
+                        file_size INTEGER,
+                        content_hash TEXT,
+                        uploaded_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%fZ', 'now')))''')
+    conn.execute('''INSERT INTO medical_data_new (username, file_name, file_type, file_path)
+                    SELECT username, file_name, file_type, file_path FROM medical_data ORDER BY rowid''')
+    conn.execute("DROP TABLE medical_data")
+    conn.execute("ALTER TABLE medical_data_new RENAME TO medical_data")
+    # Covers everything the records list reads, so listing a user's records
+    # never touches the table itself
+    conn.execute('''CREATE INDEX medical_data_username_uploaded_at
+                    ON medical_data (username, uploaded_at, id, file_name, file_type, file_path, file_size)''')
+
+
+def _content_hash_index(conn):
+    # Blob reference counts are COUNT(*) over this index (see records.py)
+    conn.execute("CREATE INDEX medical_data_content_hash ON medical_data (content_hash)")
+
+
+MIGRATIONS = [
+    _initial_schema,
+    _unique_usernames,
+    _medical_data_keys,
+    _content_hash_index,
+]
+
+
+def schema_version(conn: sqlite3.Connection) -> int:
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(conn: sqlite3.Connection) -> int:
+    """Apply every pending migration and return the resulting schema version."""
+    while True:
+        # BEGIN IMMEDIATE takes the write lock before the version is read, so
+        # two processes starting together can't both apply the same migration
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            version = schema_version(conn)
+            if version >= len(MIGRATIONS):
+                conn.rollback()
+                return version
+            MIGRATIONS[version](conn)
+            conn.execute(f"PRAGMA user_version = {version + 1}")
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
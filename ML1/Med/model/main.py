@@ -1,10 +1,22 @@
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
 import pandas as pd
+from sklearn.base import clone
 from sklearn.preprocessing import StandardScaler
-from sklearn.model_selection import train_test_split
+from sklearn.model_selection import train_test_split, StratifiedKFold
 from sklearn.linear_model import LogisticRegression
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.neighbors import KNeighborsClassifier
 from sklearn.metrics import accuracy_score, classification_report
 import pickle5 as pickle
 
+# Paths are relative to the app directory, whatever directory the script is run from
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
 
 def create_model(data): 
   X = data.drop(['diagnosis'], axis=1)
@@ -31,8 +43,117 @@ def create_model(data):
   return model, scaler
 
 
+# Models compared by --search. The app calls predict_proba, so every
+# candidate has to support it.
+CANDIDATES = [
+  ('logistic C=0.01', LogisticRegression(C=0.01, max_iter=1000)),
+  ('logistic C=0.1', LogisticRegression(C=0.1, max_iter=1000)),
+  ('logistic C=1', LogisticRegression(C=1.0, max_iter=1000)),
+  ('logistic C=10', LogisticRegression(C=10.0, max_iter=1000)),
+  ('logistic l1 C=1', LogisticRegression(C=1.0, penalty='l1', solver='liblinear')),
+  ('random forest', RandomForestClassifier(n_estimators=100, random_state=42)),
+  ('knn k=5', KNeighborsClassifier(n_neighbors=5)),
+]
+
+
+def evaluate_candidate(name, estimator, X, y, folds=5):
+  """Cross-validate one candidate, then refit it on all the data.
+
+  Returns the CV results with the refit model and scaler, so the caller can
+  time predictions without fitting again.
+  """
+  accuracies, fit_times = [], []
+  
+  for train, test in StratifiedKFold(n_splits=folds, shuffle=True, random_state=42).split(X, y):
+    # scale inside the fold so the test rows don't leak into the scaler
+    scaler = StandardScaler().fit(X[train])
+    model = clone(estimator)
+    
+    start = time.perf_counter()
+    model.fit(scaler.transform(X[train]), y[train])
+    fit_times.append(time.perf_counter() - start)
+    
+    accuracies.append(accuracy_score(y[test], model.predict(scaler.transform(X[test]))))
+  
+  scaler = StandardScaler().fit(X)
+  model = clone(estimator).fit(scaler.transform(X), y)
+  
+  result = {
+    'name': name,
+    'accuracy': float(np.mean(accuracies)),
+    'fit_ms': 1000 * float(np.mean(fit_times)),
+  }
+  return result, model, scaler
+
+
+def measure_latency(model, scaler, X, rows=200):
+  """p50/p95 of single-row predict_proba, one row at a time the way the app calls it."""
+  # warm up once so one-off initialisation isn't counted
+  model.predict_proba(scaler.transform(X[:1]))
+  
+  latencies = []
+  for row in X[:rows]:
+    start = time.perf_counter()
+    model.predict_proba(scaler.transform(row.reshape(1, -1)))
+    latencies.append(time.perf_counter() - start)
+  
+  return {
+    'predict_ms_p50': 1000 * float(np.percentile(latencies, 50)),
+    'predict_ms_p95': 1000 * float(np.percentile(latencies, 95)),
+  }
+
+
+def search_models(data, latency_budget_ms, folds=5, workers=None):
+  X = data.drop(['diagnosis'], axis=1).to_numpy()
+  y = data['diagnosis'].to_numpy()
+  
+  # Cross-validation runs one candidate per process, spread over all cores
+  with ProcessPoolExecutor(max_workers=workers) as pool:
+    futures = [pool.submit(evaluate_candidate, name, estimator, X, y, folds) for name, estimator in CANDIDATES]
+    evaluated = [f.result() for f in futures]
+  
+  # Latency decides which model is chosen, so it is measured afterwards, one
+  # candidate at a time on an otherwise idle machine. Timing inside the pool
+  # measured contention with the other candidates' fits instead.
+  results, fitted = [], {}
+  for result, model, scaler in evaluated:
+    result.update(measure_latency(model, scaler, X))
+    results.append(result)
+    fitted[result['name']] = (model, scaler)
+  
+  print(f"{'candidate':<20}{'accuracy':>10}{'fit ms':>10}{'p50 ms':>10}{'p95 ms':>10}")
+  for r in sorted(results, key=lambda r: -r['accuracy']):
+    print(f"{r['name']:<20}{r['accuracy']:>10.4f}{r['fit_ms']:>10.2f}{r['predict_ms_p50']:>10.3f}{r['predict_ms_p95']:>10.3f}")
+  
+  within_budget = [r for r in results if r['predict_ms_p95'] <= latency_budget_ms]
+  if not within_budget:
+    raise SystemExit(f"No candidate predicts within {latency_budget_ms} ms (p95)")
+  best = max(within_budget, key=lambda r: (r['accuracy'], -r['predict_ms_p95']))
+  print(f"Best within {latency_budget_ms} ms: {best['name']}")
+  
+  # the winner was already refit on all the data
+  return fitted[best['name']]
+
+
+def fuse_model(model, scaler, columns):
+  """Fold the StandardScaler into the logistic regression coefficients.
+
+  coef . ((x - mean) / scale) + b == (coef / scale) . x + (b - coef . mean / scale),
+  so scoring becomes one dot product and a sigmoid, with no sklearn needed.
+  """
+  weights = model.coef_[0] / scaler.scale_
+  bias = model.intercept_[0] - np.dot(weights, scaler.mean_)
+  
+  return {
+    'columns': list(columns),
+    'weights': weights.tolist(),
+    'bias': float(bias),
+    'classes': model.classes_.tolist(),
+  }
+
+
 def get_clean_data():
-  data = pd.read_csv("data/data.csv")
+  data = pd.read_csv(os.path.join(BASE_DIR, "data", "data.csv"))
   
   data = data.drop(['Unnamed: 32', 'id'], axis=1)
   
@@ -41,16 +162,53 @@ def get_clean_data():
   return data
 
 
+def get_feature_stats(data):
+  X = data.drop(['diagnosis'], axis=1)
+  
+  # min/max/mean of every feature, used by the app for slider defaults
+  # and radar chart scaling so it doesn't have to read the CSV
+  return {
+    'columns': list(X.columns),
+    'min': X.min().tolist(),
+    'max': X.max().tolist(),
+    'mean': X.mean().tolist(),
+  }
+
+
 def main():
+  parser = argparse.ArgumentParser(description="Train the breast cancer predictor.")
+  parser.add_argument('--search', action='store_true',
+                      help="compare several models with k-fold cross-validation and keep the best one")
+  parser.add_argument('--latency-budget-ms', type=float, default=1.0,
+                      help="p95 single-row predict latency a model must meet to be chosen by --search")
+  parser.add_argument('--folds', type=int, default=5)
+  parser.add_argument('--workers', type=int, default=None, help="processes to use (default: all cores)")
+  args = parser.parse_args()
+  
   data = get_clean_data()
 
-  model, scaler = create_model(data)
+  if args.search:
+    model, scaler = search_models(data, args.latency_budget_ms, args.folds, args.workers)
+  else:
+    model, scaler = create_model(data)
 
-  with open('model/model.pkl', 'wb') as f:
+  with open(os.path.join(BASE_DIR, 'model', 'model.pkl'), 'wb') as f:
     pickle.dump(model, f)
     
-  with open('model/scaler.pkl', 'wb') as f:
+  with open(os.path.join(BASE_DIR, 'model', 'scaler.pkl'), 'wb') as f:
     pickle.dump(scaler, f)
+    
+  with open(os.path.join(BASE_DIR, 'model', 'feature_stats.json'), 'w') as f:
+    json.dump(get_feature_stats(data), f)
+  
+  # Only a binary logistic regression can be fused; otherwise drop any stale
+  # fused model so the app falls back to model.pkl/scaler.pkl
+  fused_path = os.path.join(BASE_DIR, 'model', 'model_fused.json')
+  if isinstance(model, LogisticRegression) and len(model.classes_) == 2:
+    with open(fused_path, 'w') as f:
+      json.dump(fuse_model(model, scaler, data.drop(['diagnosis'], axis=1).columns), f)
+  elif os.path.exists(fused_path):
+    os.remove(fused_path)
   
 
 if __name__ == '__main__':
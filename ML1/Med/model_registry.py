@@ -0,0 +1,54 @@
+import os
+import pickle
+import threading
+
+import joblib
+
+# Process-wide model registry.
+# Every Streamlit session runs in the same process, so models are loaded once
+# and the same object is handed to every session. Entries are keyed by the file
+# path and remember the mtime they were loaded at, so replacing a model file on
+# disk is picked up on the next lookup without restarting the server.
+
+_LOADERS = {
+    "pickle": pickle.load,
+    "joblib": joblib.load,
+}
+
+_models = {}
+_lock = threading.Lock()
+
+
+def load_model(path, loader="joblib"):
+    """Return the model stored at `path`, deserializing it only when the file changed.
+
+    `loader` is either the name of a known format or a callable taking the
+    open binary file and returning the loaded object.
+    """
+    if not callable(loader) and loader not in _LOADERS:
+        raise ValueError(f"Unknown model loader: {loader}")
+    load = loader if callable(loader) else _LOADERS[loader]
+
+    key = os.path.abspath(path)
+    mtime = os.stat(key).st_mtime_ns
+
+    entry = _models.get(key)
+    if entry is not None and entry[0] == mtime:
+        return entry[1]
+
+    with _lock:
+        # Another session may have loaded it while we were waiting
+        entry = _models.get(key)
+        if entry is not None and entry[0] == mtime:
+            return entry[1]
+
+        with open(key, "rb") as f:
+            model = load(f)
+        _models[key] = (mtime, model)
+        return model
+
+
+def clear():
+    """Drop every cached model (mainly useful for benchmarks)."""
+    with _lock:
+        _models.clear()
@@ -0,0 +1,94 @@
+import itertools
+import queue
+import threading
+from concurrent.futures import Future
+
+# Shared PaddleOCR engine for the Reports page.
+# The engine is loaded once per process and used by every session. OCR jobs
+# go through a bounded queue served by background workers, so the Streamlit
+# script thread only submits a job and collects its result by id, waiting a
+# bounded time on each rerun. When the queue is full, submit() raises queue.Full instead of piling up work, and
+# the page asks the user to try again.
+
+QUEUE_SIZE = 8
+# PaddleOCR isn't documented as thread safe, so one worker drives the engine
+WORKERS = 1
+
+_engine = None
+_lock = threading.Lock()
+
+_jobs = queue.Queue(maxsize=QUEUE_SIZE)
+_results = {}
+_job_ids = itertools.count(1)
+_workers = []
+
+
+def get_engine():
+    """Return the process-wide PaddleOCR engine, loading it on first use."""
+    global _engine
+    if _engine is not None:
+        return _engine
+
+    with _lock:
+        if _engine is None:
+            from paddleocr import PaddleOCR
+            _engine = PaddleOCR(use_angle_cls=True, lang='en')
+    return _engine
+
+
+def _work():
+    while True:
+        job_id, image = _jobs.get()
+        future = _results[job_id]
+        if future.set_running_or_notify_cancel():
+            try:
+                future.set_result(get_engine().ocr(image, cls=True))
+            except Exception as e:
+                future.set_exception(e)
+        _jobs.task_done()
+
+
+def _start_workers():
+    with _lock:
+        while len(_workers) < WORKERS:
+            worker = threading.Thread(target=_work, name=f"ocr-{len(_workers)}", daemon=True)
+            worker.start()
+            _workers.append(worker)
+
+
+def submit(image):
+    """Queue a BGR image for OCR and return its job id.
+
+    Raises queue.Full when QUEUE_SIZE jobs are already waiting.
+    """
+    if len(_workers) < WORKERS:
+        _start_workers()
+
+    job_id = next(_job_ids)
+    _results[job_id] = Future()
+    try:
+        _jobs.put_nowait((job_id, image))
+    except queue.Full:
+        del _results[job_id]
+        raise
+    return job_id
+
+
+def result(job_id, timeout=None):
+    """Wait for a job and return its OCR result, forgetting the job afterwards.
+
+    Raises concurrent.futures.TimeoutError if it isn't finished within
+    `timeout` seconds; the job stays queued and can be collected later.
+    """
+    future = _results[job_id]
+    try:
+        return future.result(timeout)
+    finally:
+        if future.done():
+            _results.pop(job_id, None)
+
+
+def jobs_ahead(job_id):
+    """Number of unfinished jobs, queued or running, that were submitted before this one."""
+    # Job ids increase and the queue is FIFO, so the ones ahead have smaller ids
+    return sum(1 for other_id, future in list(_results.items()) if other_id < job_id and not future.done())
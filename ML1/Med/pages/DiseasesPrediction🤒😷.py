@@ -1,41 +1,32 @@
 import streamlit as st
-import pickle
 import pandas as pd
 import plotly.graph_objects as go
 import numpy as np
-import os
-import tempfile
+import json
 from streamlit_option_menu import option_menu
-from werkzeug.utils import secure_filename
-from PIL import Image
-from tensorflow.keras.models import Model
-from tensorflow.keras.layers import Input, Flatten, Dense, Dropout
-from tensorflow.keras.applications.vgg19 import VGG19
-import cv2
-import joblib
-
-base_model = VGG19(include_top=False, input_shape=(128,128,3))
-x = base_model.output
-flat=Flatten()(x)
-class_1 = Dense(4608, activation='relu')(flat)
-drop_out = Dropout(0.2)(class_1)
-class_2 = Dense(1152, activation='relu')(drop_out)
-output = Dense(2, activation='softmax')(class_2)
-model_03 = Model(base_model.inputs, output)
-print(model_03.summary())
-
-def get_clean_data():
-  data = pd.read_csv("data/data.csv")
+from assets import asset_path
+from model_registry import load_model
+import breast_cancer
+import clinical_models
+import pneumonia
+
+def _read_feature_stats(f):
+  stats = json.load(f)
   
-  data = data.drop(['Unnamed: 32', 'id'], axis=1)
-  
-  data['diagnosis'] = data['diagnosis'].map({ 'M': 1, 'B': 0 })
-  
-  return data
+  return {
+    'index': {key: i for i, key in enumerate(stats['columns'])},
+    'min': np.array(stats['min']),
+    'max': np.array(stats['max']),
+    'mean': np.array(stats['mean']),
+    'range': np.array(stats['max']) - np.array(stats['min']),
+  }
+def get_feature_stats():
+  # Written by model/main.py next to scaler.pkl when the model is trained
+  return load_model(breast_cancer.FEATURE_STATS_PATH, loader=_read_feature_stats)
 def add_sidebar():
   st.sidebar.header("Cell Nuclei Measurements")
   
-  data = get_clean_data()
+  stats = get_feature_stats()
   
   slider_labels = [
         ("Radius (mean)", "radius_mean"),
@@ -73,28 +64,25 @@ def add_sidebar():
   input_dict = {}
 
   for label, key in slider_labels:
+    i = stats['index'][key]
     input_dict[key] = st.sidebar.slider(
       label,
       min_value=float(0),
-      max_value=float(data[key].max()),
-      value=float(data[key].mean())
+      max_value=float(stats['max'][i]),
+      value=float(stats['mean'][i])
     )
     
   return input_dict
 def get_scaled_values(input_dict):
-  data = get_clean_data()
-  
-  X = data.drop(['diagnosis'], axis=1)
+  stats = get_feature_stats()
   
-  scaled_dict = {}
+  keys = list(input_dict.keys())
+  idx = [stats['index'][key] for key in keys]
+  values = np.fromiter(input_dict.values(), dtype=float, count=len(keys))
   
-  for key, value in input_dict.items():
-    max_val = X[key].max()
-    min_val = X[key].min()
-    scaled_value = (value - min_val) / (max_val - min_val)
-    scaled_dict[key] = scaled_value
+  scaled = (values - stats['min'][idx]) / stats['range'][idx]
   
-  return scaled_dict
+  return dict(zip(keys, scaled))
 def get_radar_chart(input_data):
   
   input_data = get_scaled_values(input_data)
@@ -150,14 +138,9 @@ def get_radar_chart(input_data):
   
   return fig
 def add_predictions(input_data):
-  model = pickle.load(open("model/model.pkl", "rb"))
-  scaler = pickle.load(open("model/scaler.pkl", "rb"))
-  
   input_array = np.array(list(input_data.values())).reshape(1, -1)
   
-  input_array_scaled = scaler.transform(input_array)
-  
-  prediction = model.predict(input_array_scaled)
+  prediction, probabilities = breast_cancer.predict(input_array)
   
   st.subheader("Cell cluster prediction")
   st.write("The cell cluster is:")
@@ -168,18 +151,14 @@ def add_predictions(input_data):
     st.write("<span class='diagnosis malicious'>Malicious</span>", unsafe_allow_html=True)
     
   
-  st.write("Probability of being benign: ", model.predict_proba(input_array_scaled)[0][0])
-  st.write("Probability of being malicious: ", model.predict_proba(input_array_scaled)[0][1])
+  st.write("Probability of being benign: ", probabilities[0][0])
+  st.write("Probability of being malicious: ", probabilities[0][1])
   
   st.write("This app can assist medical professionals in making a diagnosis, but should not be used as a substitute for a professional diagnosis.")
 
-def getResult(img):
-    image=cv2.imread(img)
-    image = Image.fromarray(image, 'RGB')
-    image = image.resize((128, 128))
-    image=np.array(image)
-    input_img = np.expand_dims(image, axis=0)
-    result=model_03.predict(input_img)
+def getResult(buffer):
+    input_img = pneumonia.preprocess(buffer)
+    result=pneumonia.get_runtime().predict(input_img)
     result01=np.argmax(result,axis=1)
     return result01
 def get_className(classNo):
@@ -207,7 +186,7 @@ def main():
                     default_index=0)
   
   if selected=='Breast Cancer Predictor':
-    with open("assets/style.css") as f:
+    with open(asset_path("assets", "style.css")) as f:
       st.markdown("<style>{}</style>".format(f.read()), unsafe_allow_html=True)
     
     input_data = add_sidebar()
@@ -225,7 +204,6 @@ def main():
       add_predictions(input_data) 
   if selected == 'Diabetes Prediction':
     st.title("Diabetes Prediction Using Machine Learning")
-    diabetes_model = joblib.load("pages/diabetes_new.pkl")
 
     col1, col2, col3 = st.columns(3)
 
@@ -249,60 +227,16 @@ def main():
     diabetes_result = ""
 
     if st.button("Diabetes Test Result"):
-        # Initialize all variables with default values
-        NewBMI_Underweight = 0
-        NewBMI_Overweight = 0
-        NewBMI_Obesity_1 = 0
-        NewBMI_Obesity_2 = 0
-        NewBMI_Obesity_3 = 0
-        NewInsulinScore_Normal = 0
-        NewGlucose_Low = 0
-        NewGlucose_Normal = 0
-        NewGlucose_Overweight = 0
-        NewGlucose_Secret = 0
-
-        # Calculate BMI category
-        if float(BMI) <= 18.5:
-            NewBMI_Underweight = 1
-        elif 18.5 < float(BMI) <= 24.9:
-            pass  # Normal BMI, no flag needed
-        elif 24.9 < float(BMI) <= 29.9:
-            NewBMI_Overweight = 1
-        elif 29.9 < float(BMI) <= 34.9:
-            NewBMI_Obesity_1 = 1
-        elif 34.9 < float(BMI) <= 39.9:
-            NewBMI_Obesity_2 = 1
-        elif float(BMI) > 39.9:
-            NewBMI_Obesity_3 = 1
-
-        # Calculate Insulin category
-        if 16 <= float(Insulin) <= 166:
-            NewInsulinScore_Normal = 1
-
-        # Calculate Glucose category
-        if float(Glucose) <= 70:
-            NewGlucose_Low = 1
-        elif 70 < float(Glucose) <= 99:
-            NewGlucose_Normal = 1
-        elif 99 < float(Glucose) <= 126:
-            NewGlucose_Overweight = 1
-        elif float(Glucose) > 126:
-            NewGlucose_Secret = 1
-
-        # Prepare user input for prediction
         user_input = [
             Pregnancies, Glucose, BloodPressure, SkinThickness, Insulin,
-            BMI, DiabetesPedigreeFunction, Age, NewBMI_Underweight,
-            NewBMI_Overweight, NewBMI_Obesity_1, NewBMI_Obesity_2,
-            NewBMI_Obesity_3, NewInsulinScore_Normal, NewGlucose_Low,
-            NewGlucose_Normal, NewGlucose_Overweight, NewGlucose_Secret
+            BMI, DiabetesPedigreeFunction, Age
         ]
 
         # Convert all inputs to float
         user_input = [float(x) for x in user_input]
 
-        # Make prediction
-        prediction = diabetes_model.predict([user_input])
+        # Make prediction (BMI, insulin and glucose flags are added by the model helper)
+        prediction = clinical_models.predict('diabetes', [user_input])
         if prediction[0] == 1:
             diabetes_result = "The person has diabetes"
         else:
@@ -313,7 +247,6 @@ def main():
   if selected == 'Heart Disease Prediction':
     st.title("Heart Disease Prediction Using Machine Learning")
     col1, col2, col3  = st.columns(3)
-    heart_disease_model=joblib.load("pages/heart_new.pkl")
 
     with col1:
         age = st.text_input("Age")
@@ -351,7 +284,7 @@ def main():
     if st.button("Heart Disease Test Result"):
         user_input = [age,sex,cp,trestbps,chol,fbs,restecg,thalach,exang,oldpeak,slope,ca,thal]
         user_input = [float(x) for x in user_input]
-        prediction = heart_disease_model.predict([user_input])
+        prediction = clinical_models.predict('heart', [user_input])
         if prediction[0]==1:
             heart_disease_result = "This person is having heart disease"
         else:
@@ -362,7 +295,6 @@ def main():
     st.title("Kidney Disease Prediction using ML")
 
     col1, col2, col3, col4, col5 = st.columns(5)
-    kidney_disease_model=joblib.load("pages\\kidney_new.pkl")
 
     with col1:
         age = st.text_input('Age')
@@ -451,7 +383,7 @@ def main():
 
         user_input = [float(x) for x in user_input]
 
-        prediction = kidney_disease_model.predict([user_input])
+        prediction = clinical_models.predict('kidney', [user_input])
 
         if prediction[0] == 1:
             kindey_diagnosis = "The person has Kidney's disease"
@@ -463,41 +395,58 @@ def main():
     # Add a title for the section
     st.title("Pneumonia Detection using Chest X-ray")
 
-    # File uploader for chest X-ray image
-    uploaded_image = st.file_uploader("Upload a chest X-ray image", type=["jpg", "jpeg", "png"])
-
-    if uploaded_image is not None:
-        st.markdown("<h4>Chest X-Ray Detection</h4>", unsafe_allow_html=True)  # Smaller header for section
-
-        # Save the uploaded file to a temporary directory
-        try:
-            temp_dir = tempfile.mkdtemp()
-            file_path = os.path.join(temp_dir, uploaded_image.name)
-            with open(file_path, "wb") as f:
-                f.write(uploaded_image.read())
-
-            # Display the uploaded image
-            st.image(uploaded_image, caption="Uploaded Chest X-ray", width=200)
-
-            # Perform the pneumonia detection
-            value = getResult(file_path)
-            result = get_className(value[0])
-
-            # Display the result
-            st.write("Prediction result:", result)
-
-            # Add additional information based on the prediction
-            if result == "Pneumonia detected":
-                st.info(
-                    "**Pneumonia** is an infection that inflames the air sacs in one or both lungs. The air sacs may fill with fluid or pus, causing symptoms such as a cough with phlegm or pus, fever, chills, and difficulty breathing. It can range in severity from mild to life-threatening and is most serious for infants, young children, people older than 65, and individuals with underlying health problems or weakened immune systems."
-                )
-            else:
-                st.info(
-                    "The chest X-ray does not show signs of pneumonia. However, if you have any symptoms like persistent cough, fever, or difficulty breathing, it is recommended to consult a healthcare professional for further examination."
-                )
-
-        except Exception as e:
-            st.error(f"An error occurred while processing the image: {str(e)}")
+    mode = st.radio("Mode", ["Single image", "Batch screening"], horizontal=True)
+
+    if mode == "Single image":
+        # File uploader for chest X-ray image
+        uploaded_image = st.file_uploader("Upload a chest X-ray image", type=["jpg", "jpeg", "png"])
+
+        if uploaded_image is not None:
+            st.markdown("<h4>Chest X-Ray Detection</h4>", unsafe_allow_html=True)  # Smaller header for section
+
+            try:
+                # Display the uploaded image
+                st.image(uploaded_image, caption="Uploaded Chest X-ray", width=200)
+
+                # Perform the pneumonia detection
+                value = getResult(uploaded_image.getvalue())
+                result = get_className(value[0])
+
+                # Display the result
+                st.write("Prediction result:", result)
+
+                # Add additional information based on the prediction
+                if result == "Pneumonia detected":
+                    st.info(
+                        "**Pneumonia** is an infection that inflames the air sacs in one or both lungs. The air sacs may fill with fluid or pus, causing symptoms such as a cough with phlegm or pus, fever, chills, and difficulty breathing. It can range in severity from mild to life-threatening and is most serious for infants, young children, people older than 65, and individuals with underlying health problems or weakened immune systems."
+                    )
+                else:
+                    st.info(
+                        "The chest X-ray does not show signs of pneumonia. However, if you have any symptoms like persistent cough, fever, or difficulty breathing, it is recommended to consult a healthcare professional for further examination."
+                    )
+
+            except Exception as e:
+                st.error(f"An error occurred while processing the image: {str(e)}")
+
+    else:
+        # Batch screening: many X-rays scored together
+        uploaded_images = st.file_uploader("Upload chest X-ray images", type=["jpg", "jpeg", "png"], accept_multiple_files=True)
+
+        if uploaded_images and st.button("Screen X-rays"):
+            try:
+                with st.spinner(f"Screening {len(uploaded_images)} images..."):
+                    classes, confidences = pneumonia.predict_batch([f.getvalue() for f in uploaded_images])
+
+                results = pd.DataFrame({
+                    "File": [f.name for f in uploaded_images],
+                    "Prediction": [get_className(c) for c in classes],
+                    "Confidence": confidences,
+                })
+                st.dataframe(results, use_container_width=True)
+                st.write(f"Pneumonia detected in {int(np.sum(classes == 1))} of {len(classes)} images.")
+
+            except Exception as e:
+                st.error(f"An error occurred while processing the images: {str(e)}")
   
 
   
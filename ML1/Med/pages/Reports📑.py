@@ -1,20 +1,18 @@
 import streamlit as st
-from paddleocr import PaddleOCR
 import matplotlib.pyplot as plt
 from PIL import Image
 import numpy as np
 import cv2
-import sqlite3
-import os
+import queue
+from concurrent.futures import TimeoutError
 
-# Database connection (You can modify this section to suit your database setup)
-conn = sqlite3.connect('user_data.db', check_same_thread=False)
-c = conn.cursor()
+import db
+import ocr_engine
+import records as medical_records
 
-# Create medical_data table if not exists
-c.execute('''CREATE TABLE IF NOT EXISTS medical_data
-             (username TEXT, file_name TEXT, file_type TEXT, file_path TEXT)''')
-conn.commit()
+RECORDS_PER_PAGE = 20
+# How long one run of the page waits for OCR before offering to check again
+OCR_WAIT_S = 3
 
 # Helper function to draw OCR results
 def draw_ocr(image, boxes, txts, scores):
@@ -34,8 +32,7 @@ def detect_blur(image, threshold=100):
 
 # Function to fetch all usernames from the database
 def fetch_usernames():
-    c.execute("SELECT DISTINCT username FROM medical_data")
-    return [row[0] for row in c.fetchall()]
+    return db.list_usernames()
 
 # Title of the app
 st.title('PaddleOCR Text Detection and Medical Data Management')
@@ -74,31 +71,55 @@ if st.session_state.get('username'):
         if detect_blur(img):
             st.warning("The uploaded image is blurry. Please upload a clearer image for better OCR results.")
 
-        # Initialize PaddleOCR
-        ocr = PaddleOCR(use_angle_cls=True, lang='en')
-
-        # Perform OCR
-        result = ocr.ocr(img, cls=True)
-
-        # Extract and display results
-        boxes, texts, scores = [], [], []
-        for line in result:
-            for res in line:
-                boxes.append(res[0])
-                texts.append(res[1][0])
-                scores.append(res[1][1])
-
-        # Display OCR results
-        st.markdown("### Detected Texts:")
-        for i, text in enumerate(texts):
-            st.write(f"**Text**: {text}, **Confidence**: {scores[i]:.2f}")
-
-        # Draw annotations on the image
-        annotated_image = draw_ocr(img, boxes, texts, scores)
-
-        # Convert the annotated image to RGB for display
-        annotated_image_rgb = cv2.cvtColor(annotated_image, cv2.COLOR_BGR2RGB)
-        st.image(annotated_image_rgb, caption='Annotated Image with OCR Boxes.', use_column_width=True)
+        # OCR runs on the shared engine's worker queue. Job ids and results
+        # are kept per upload, so a rerun picks up the job already submitted
+        # and never recognises the same image twice.
+        ocr_results = st.session_state.setdefault('ocr_results', {})
+        ocr_jobs = st.session_state.setdefault('ocr_jobs', {})
+        result = ocr_results.get(uploaded_file.file_id)
+        if result is None and uploaded_file.file_id not in ocr_jobs:
+            try:
+                ocr_jobs[uploaded_file.file_id] = ocr_engine.submit(img)
+            except queue.Full:
+                st.warning("Text detection is busy right now. Please try again in a moment.")
+
+        job_id = ocr_jobs.get(uploaded_file.file_id)
+        if result is None and job_id is not None:
+            try:
+                with st.spinner("Detecting text..."):
+                    result = ocr_results[uploaded_file.file_id] = ocr_engine.result(job_id, timeout=OCR_WAIT_S)
+            except TimeoutError:
+                ahead = ocr_engine.jobs_ahead(job_id)
+                st.info(f"Still detecting text ({ahead} images ahead of yours)." if ahead else "Still detecting text.")
+                st.button("Check again")
+            except Exception as e:
+                # The job is over either way; the next run submits the image again
+                del ocr_jobs[uploaded_file.file_id]
+                st.error(f"Text detection failed: {e}")
+            else:
+                del ocr_jobs[uploaded_file.file_id]
+
+        if result is not None:
+            # Extract and display results
+            boxes, texts, scores = [], [], []
+            for line in result:
+                # PaddleOCR returns None for an image without text
+                for res in line or []:
+                    boxes.append(res[0])
+                    texts.append(res[1][0])
+                    scores.append(res[1][1])
+
+            # Display OCR results
+            st.markdown("### Detected Texts:")
+            for i, text in enumerate(texts):
+                st.write(f"**Text**: {text}, **Confidence**: {scores[i]:.2f}")
+
+            # Draw annotations on the image
+            annotated_image = draw_ocr(img, boxes, texts, scores)
+
+            # Convert the annotated image to RGB for display
+            annotated_image_rgb = cv2.cvtColor(annotated_image, cv2.COLOR_BGR2RGB)
+            st.image(annotated_image_rgb, caption='Annotated Image with OCR Boxes.', use_column_width=True)
 
     # Medical Data Upload Section
     st.markdown("### 📥 Upload Medical Data")
@@ -106,40 +127,62 @@ if st.session_state.get('username'):
 
     uploaded_files = st.file_uploader("Choose files to upload", accept_multiple_files=True, type=["pdf", "jpg", "jpeg", "png"])
 
-    if uploaded_files:
-        upload_folder = "uploaded_files"
-        os.makedirs(upload_folder, exist_ok=True)
-
-        for uploaded_file in uploaded_files:
-            file_name = uploaded_file.name
-            file_type = uploaded_file.type
-            file_path = os.path.join(upload_folder, file_name)
-            
-            with open(file_path, "wb") as f:
-                f.write(uploaded_file.getbuffer())
-            
-            # Save file info in the database
-            c.execute("INSERT INTO medical_data (username, file_name, file_type, file_path) VALUES (?, ?, ?, ?)", 
-                      (st.session_state['username'], file_name, file_type, file_path))
-            conn.commit()
-            st.success(f"Uploaded {file_name} successfully!")
-
-    # Display stored medical files
+    # The uploader keeps its files across reruns; only record each upload once
+    saved_uploads = st.session_state.setdefault('saved_uploads', set())
+    new_files = [f for f in uploaded_files or [] if f.file_id not in saved_uploads]
+
+    if new_files:
+        # Files are stored by content, so re-uploads and identical files take no extra space
+        medical_records.save_uploads(st.session_state['username'], new_files)
+        for uploaded_file in new_files:
+            saved_uploads.add(uploaded_file.file_id)
+            st.success(f"Uploaded {uploaded_file.name} successfully!")
+
+    # Display stored medical files, one page at a time
     st.markdown("### 🗂 Your Medical Records")
-    c.execute("SELECT file_name, file_type, file_path FROM medical_data WHERE username = ?", (st.session_state['username'],))
-    records = c.fetchall()
+    username = st.session_state['username']
+    # Keyset cursor of every page visited so far; the last one is the current page
+    cursors = st.session_state.setdefault(f'records-cursors-{username}', [None])
+    records = db.list_records_page(username, cursors[-1], RECORDS_PER_PAGE + 1)
+    has_next = len(records) > RECORDS_PER_PAGE
+    records = records[:RECORDS_PER_PAGE]
 
     if records:
-        for index, record in enumerate(records):
-            file_name, file_type, file_path = record
-            st.write(f"**{file_name}** ({file_type})")
-            with open(file_path, "rb") as f:
-                st.download_button(
-                    label=f"Download {file_name}",
-                    data=f,
-                    file_name=file_name,
-                    key=f"download-{index}"  # Ensure unique key by appending the index or another identifier
-                )
+        for record in records:
+            size = f", {record.file_size / 1024:.0f} KB" if record.file_size is not None else ""
+            st.write(f"**{record.file_name}** ({record.file_type}{size})")
+            # Only the file the user asked for is read from disk, and only on the
+            # run right after they asked: the request is cleared once the button
+            # has rendered, so later reruns don't read the file again
+            if st.session_state.get('download_id') == record.id:
+                del st.session_state['download_id']
+                try:
+                    f = open(medical_records.local_path(record.file_path), "rb")
+                except FileNotFoundError:
+                    st.error(f"The stored file for {record.file_name} could not be found.")
+                else:
+                    # Not streamed in chunks: st.download_button reads the whole
+                    # file into memory and sends it with the page
+                    with f:
+                        st.download_button(
+                            label=f"Download {record.file_name}",
+                            data=f,
+                            file_name=record.file_name,
+                            key=f"download-{record.id}"
+                        )
+            elif st.button(f"Prepare download of {record.file_name}", key=f"prepare-{record.id}"):
+                st.session_state['download_id'] = record.id
+                st.rerun()
+
+        prev_col, page_col, next_col = st.columns(3)
+        with page_col:
+            st.write(f"Page {len(cursors)}")
+        if len(cursors) > 1 and prev_col.button("⬅ Previous"):
+            cursors.pop()
+            st.rerun()
+        if has_next and next_col.button("Next ➡"):
+            cursors.append((records[-1].uploaded_at, records[-1].id))
+            st.rerun()
     else:
         st.info("No medical records found.")
 else:
@@ -0,0 +1,197 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+from PIL import Image
+
+from assets import asset_path
+
+# Pneumonia detection model (VGG19 base + dense head).
+# TensorFlow is only imported when the model is first needed, so pages that
+# never run pneumonia detection don't pay for it.
+
+WEIGHTS_PATH = asset_path("model", "pneumonia_vgg19.h5")
+# Quantized CPU model written by export_pneumonia_tflite.py, used instead of
+# the Keras model when present
+TFLITE_PATH = asset_path("model", "pneumonia_vgg19.tflite")
+IMAGE_SIZE = (128, 128)
+BATCH_SIZE = 32
+
+_model = None
+_runtime = None
+_lock = threading.Lock()
+
+
+def build_model(base_weights='imagenet'):
+    from tensorflow.keras.models import Model
+    from tensorflow.keras.layers import Flatten, Dense, Dropout
+    from tensorflow.keras.applications.vgg19 import VGG19
+
+    base_model = VGG19(weights=base_weights, include_top=False, input_shape=IMAGE_SIZE + (3,))
+    x = base_model.output
+    flat = Flatten()(x)
+    class_1 = Dense(4608, activation='relu')(flat)
+    drop_out = Dropout(0.2)(class_1)
+    class_2 = Dense(1152, activation='relu')(drop_out)
+    output = Dense(2, activation='softmax')(class_2)
+    return Model(base_model.inputs, output)
+
+
+def get_model(weights_path=WEIGHTS_PATH):
+    """Return the process-wide pneumonia model, building it on first use."""
+    global _model
+    if _model is not None:
+        return _model
+
+    with _lock:
+        if _model is None:
+            if os.path.exists(weights_path):
+                # Trained weights cover the whole network, skip the ImageNet download
+                model = build_model(base_weights=None)
+                model.load_weights(weights_path)
+            else:
+                model = build_model()
+            _model = model
+    return _model
+
+
+class TFLiteModel:
+    """Runs a .tflite export of the model with the same predict API as Keras."""
+
+    def __init__(self, path):
+        try:
+            from tflite_runtime.interpreter import Interpreter
+        except ImportError:
+            from tensorflow.lite import Interpreter
+
+        self.interpreter = Interpreter(model_path=path)
+        self._input = self.interpreter.get_input_details()[0]['index']
+        self._output = self.interpreter.get_output_details()[0]['index']
+        self._batch = None
+        # an interpreter can only run one invocation at a time
+        self._lock = threading.Lock()
+
+    def predict_on_batch(self, inputs):
+        inputs = np.ascontiguousarray(inputs, dtype=np.float32)
+        with self._lock:
+            if self._batch != len(inputs):
+                self.interpreter.resize_tensor_input(self._input, inputs.shape)
+                self.interpreter.allocate_tensors()
+                self._batch = len(inputs)
+            self.interpreter.set_tensor(self._input, inputs)
+            self.interpreter.invoke()
+            return self.interpreter.get_tensor(self._output).copy()
+
+    def predict(self, inputs, batch_size=BATCH_SIZE, verbose=0):
+        return np.concatenate([
+            self.predict_on_batch(inputs[i:i + batch_size]) for i in range(0, len(inputs), batch_size)
+        ])
+
+
+def export_tflite(model=None, path=TFLITE_PATH, quantization='float16'):
+    """Convert the Keras model to TFLite with post-training quantization.
+
+    'float16' halves the file and keeps float activations; 'int8' stores the
+    weights as int8 (dynamic range quantization), about a quarter of the size.
+    """
+    import tensorflow as tf
+
+    if quantization not in ('float16', 'int8'):
+        raise ValueError(f"Unknown quantization: {quantization}")
+
+    converter = tf.lite.TFLiteConverter.from_keras_model(model if model is not None else get_model())
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    if quantization == 'float16':
+        converter.target_spec.supported_types = [tf.float16]
+
+    with open(path, 'wb') as f:
+        f.write(converter.convert())
+    return path
+
+
+def check_parity(inputs, reference, candidate, batch_size=BATCH_SIZE):
+    """Compare two models on the same preprocessed images.
+
+    Returns how often the predicted classes agree, the largest difference in
+    softmax output, and the indices of the images where the classes differ.
+    """
+    expected = np.asarray(reference.predict(inputs, batch_size=batch_size, verbose=0))
+    actual = np.asarray(candidate.predict(inputs, batch_size=batch_size, verbose=0))
+    disagree = np.flatnonzero(expected.argmax(axis=1) != actual.argmax(axis=1))
+    return {
+        'images': len(inputs),
+        'agreement': 1 - len(disagree) / len(inputs),
+        'max_abs_diff': float(np.abs(expected - actual).max()),
+        'disagreements': disagree.tolist(),
+    }
+
+
+def get_runtime(tflite_path=TFLITE_PATH):
+    """Return the model used for inference: the TFLite export if there is one, else the Keras model."""
+    global _runtime
+    if _runtime is not None:
+        return _runtime
+
+    if not os.path.exists(tflite_path):
+        return get_model()
+
+    with _lock:
+        if _runtime is None:
+            _runtime = TFLiteModel(tflite_path)
+    return _runtime
+
+
+_buffers = threading.local()
+
+
+def _decode_into(buffer, dst):
+    image = cv2.imdecode(np.frombuffer(buffer, dtype=np.uint8), cv2.IMREAD_COLOR)
+    if image is None:
+        raise ValueError("Could not decode the uploaded image")
+    # Resize with PIL like the model's original input pipeline: its bicubic
+    # filter antialiases when downscaling, cv2.INTER_CUBIC doesn't, and the
+    # two differ by up to ~80 levels per pixel on real X-rays
+    resized = Image.fromarray(image).resize(IMAGE_SIZE[::-1], Image.BICUBIC)
+    np.copyto(dst, np.asarray(resized))
+
+
+def preprocess(buffer, out=None):
+    """Decode an encoded image (bytes or buffer) straight into a (1, 128, 128, 3) float32 batch.
+
+    Channels are kept in OpenCV's BGR order and pixel values in 0..255, which is
+    what the model has always been fed. When `out` is not given a per-thread
+    array is reused, so the result is only valid until the next call.
+    """
+    if out is None:
+        out = getattr(_buffers, 'input', None)
+        if out is None:
+            out = _buffers.input = np.empty((1,) + IMAGE_SIZE + (3,), dtype=np.float32)
+
+    _decode_into(buffer, out[0])
+    return out
+
+
+def predict_batch(buffers, batch_size=BATCH_SIZE, workers=None):
+    """Classify many encoded images at once.
+
+    Images are decoded in parallel into one stacked array (OpenCV and PIL
+    release the GIL while decoding and resizing) and the model runs on fixed-size batches.
+    Returns the predicted class index and its softmax confidence per image.
+    """
+    if not len(buffers):
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+    inputs = np.empty((len(buffers),) + IMAGE_SIZE + (3,), dtype=np.float32)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        # list() re-raises the first decoding error, if any
+        list(pool.map(_decode_into, buffers, inputs))
+
+    model = get_runtime()
+    probabilities = np.concatenate([
+        np.asarray(model.predict_on_batch(inputs[i:i + batch_size]))
+        for i in range(0, len(inputs), batch_size)
+    ])
+    classes = np.argmax(probabilities, axis=1)
+    return classes, probabilities[np.arange(len(classes)), classes]
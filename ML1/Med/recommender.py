@@ -0,0 +1,316 @@
+import ast
+import json
+from collections import namedtuple
+from functools import lru_cache
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from assets import asset_path
+from model_registry import load_model
+
+# Symptom-based disease prediction and recommendations used by the Medicine page.
+
+SYMPTOM_MODEL_PATH = asset_path("models", "svc.joblib")
+RECOMMENDATIONS_PATH = asset_path("datasets", "recommendations.json")
+SEVERITY_PATH = asset_path("datasets", "Symptom-severity.csv")
+
+# Format of the symptom model artifact written by train_symptom_model.py
+SYMPTOM_MODEL_FORMAT = 2
+
+
+class SymptomModel:
+    """A trained symptom classifier bundled with the vocabularies it was trained on.
+
+    `symptoms_dict` maps symptom names to input columns, `diseases_list` maps
+    class labels to disease names and `severity` holds the symptom severity
+    weights in input column order.
+
+    Diseases are ranked by probability when the classifier provides
+    predict_proba (`calibrated`), and by one-vs-one votes otherwise.
+    """
+
+    def __init__(self, classifier, symptoms, diseases, severity, version):
+        self.classifier = classifier
+        self.symptoms_dict = {name: i for i, name in enumerate(symptoms)}
+        self.diseases_list = dict(enumerate(diseases))
+        self.severity = severity
+        self.version = version
+        self.calibrated = hasattr(classifier, 'predict_proba')
+        if not self.calibrated:
+            # Raw pairwise decision values. The 'ovr' shape aggregates all
+            # 820 class pairs in Python and takes ~50x longer; predict() is
+            # the same either way.
+            classifier.decision_function_shape = 'ovo'
+            self._pairs = np.triu_indices(len(classifier.classes_), 1)
+
+
+def save_symptom_model(artifact, path=SYMPTOM_MODEL_PATH):
+    """Write a symptom model artifact (a dict, see train_symptom_model.py).
+
+    joblib stores numpy arrays uncompressed inside the file, and loading with
+    mmap_mode='r' maps them instead of copying. Worker processes on one host
+    therefore share a single page-cached copy of the support vectors.
+    """
+    joblib.dump(dict(artifact, format=SYMPTOM_MODEL_FORMAT), path)
+
+
+def read_symptom_model(f):
+    artifact = joblib.load(f.name, mmap_mode='r')
+    if not isinstance(artifact, dict) or artifact.get('format') != SYMPTOM_MODEL_FORMAT:
+        raise ValueError(f"{f.name} is not a symptom model artifact; retrain it with train_symptom_model.py")
+    return SymptomModel(
+        artifact['classifier'], artifact['symptoms'], artifact['diseases'], artifact['severity'], artifact['version']
+    )
+
+
+def load_symptom_model(path=SYMPTOM_MODEL_PATH):
+    return load_model(path, loader=read_symptom_model)
+
+
+def encode_symptoms(model, symptoms):
+    """Encode a set of symptom names as a bitmask with bit `symptoms_dict[name]` set."""
+    mask = 0
+    for item in symptoms:
+        mask |= 1 << model.symptoms_dict[item]
+    return mask
+
+
+def decode_symptoms(model, mask):
+    """Expand a symptom bitmask into the model's 0/1 input vector."""
+    input_vector = np.zeros(len(model.symptoms_dict))
+    while mask:
+        low = mask & -mask
+        input_vector[low.bit_length() - 1] = 1
+        mask ^= low
+    return input_vector
+
+
+def class_scores(model, X):
+    """Score every class for each row of the 0/1 matrix X, in classes_ order.
+
+    Calibrated classifiers give probabilities. Otherwise each of the pairwise
+    SVMs casts one vote for one of its two classes, exactly as libsvm counts
+    them, so the class with the most votes (the first one on ties) is the one
+    classifier.predict() returns.
+    """
+    if model.calibrated:
+        return model.classifier.predict_proba(X)
+    n = len(model.classifier.classes_)
+    first, second = model._pairs
+    winners = np.where(model.classifier.decision_function(X) > 0, first, second)
+    winners += n * np.arange(len(winners))[:, None]
+    return np.bincount(winners.ravel(), minlength=len(winners) * n).reshape(-1, n)
+
+
+def predict_classes(model, X):
+    """The highest scoring class label for each row of X."""
+    return model.classifier.classes_[np.argmax(class_scores(model, X), axis=1)]
+
+
+@lru_cache(maxsize=4096)
+def _scores_encoded(model, mask):
+    scores = class_scores(model, [decode_symptoms(model, mask)])[0]
+    scores.setflags(write=False)
+    return scores
+
+
+def get_predicted_value(model, patient_symptoms):
+    """Predict the disease for a list of symptom names.
+
+    Results are cached per model and symptom set, so repeated combinations
+    don't run the SVC again.
+    """
+    scores = _scores_encoded(model, encode_symptoms(model, patient_symptoms))
+    return model.diseases_list[model.classifier.classes_[np.argmax(scores)]]
+
+
+def get_top_k(model, index, patient_symptoms, k=3):
+    """Return the k highest scoring diseases as (disease, score, Recommendation) tuples.
+
+    All k come from one pass over every class (see class_scores). The score
+    is a probability when `model.calibrated`, otherwise a vote count out of
+    len(model.diseases_list) - 1. The first entry is always the disease
+    get_predicted_value returns.
+    """
+    scores = _scores_encoded(model, encode_symptoms(model, patient_symptoms))
+    k = min(k, len(scores))
+    top = np.argpartition(scores, -k)[-k:]
+    # stable sort, so ties keep the class order np.argmax uses
+    top = top[np.lexsort((top, -scores[top]))]
+
+    results = []
+    for i in top:
+        disease = model.diseases_list[model.classifier.classes_[i]]
+        results.append((disease, scores[i].item(), get_recommendation(index, disease)))
+    return results
+
+
+# Everything the page shows for one disease
+Recommendation = namedtuple('Recommendation', ['description', 'precautions', 'medications', 'diets', 'workouts'])
+
+# The CSVs don't spell every disease the same way as the model's disease names
+_DISEASE_ALIASES = {'peptic ulcer diseae': 'peptic ulcer disease'}
+
+
+def disease_key(name):
+    key = ' '.join(name.split()).lower()
+    return _DISEASE_ALIASES.get(key, key)
+
+
+def _parse_list(value):
+    # medications.csv and diets.csv store each list as its Python repr
+    return tuple(ast.literal_eval(value))
+
+
+def build_recommendation_index(description, precautions, medications, diets, workout):
+    """Group the five recommendation tables into one record per disease."""
+    precaution_columns = ['Precaution_1', 'Precaution_2', 'Precaution_3', 'Precaution_4']
+    records = {}
+
+    def record(name):
+        return records.setdefault(disease_key(name), {
+            'description': '', 'precautions': [], 'medications': [], 'diets': [], 'workouts': []
+        })
+
+    for name, desc in zip(description['Disease'], description['Description']):
+        record(name)['description'] = desc
+    for name, row in zip(precautions['Disease'], precautions[precaution_columns].itertuples(index=False)):
+        record(name)['precautions'].extend(p for p in row if isinstance(p, str))
+    for name, meds in zip(medications['Disease'], medications['Medication']):
+        record(name)['medications'].extend(_parse_list(meds))
+    for name, diet in zip(diets['Disease'], diets['Diet']):
+        record(name)['diets'].extend(_parse_list(diet))
+    for name, wrkout in zip(workout['disease'], workout['workout']):
+        record(name)['workouts'].append(wrkout)
+
+    return {
+        key: Recommendation(
+            r['description'], tuple(r['precautions']), tuple(r['medications']), tuple(r['diets']), tuple(r['workouts'])
+        )
+        for key, r in records.items()
+    }
+
+
+def save_recommendation_index(index, path=RECOMMENDATIONS_PATH):
+    with open(path, 'w') as f:
+        json.dump({key: list(rec) for key, rec in index.items()}, f, separators=(',', ':'))
+
+
+def read_recommendation_index(f):
+    return {key: Recommendation(rec[0], *map(tuple, rec[1:])) for key, rec in json.load(f).items()}
+
+
+def get_recommendation(index, disease):
+    return index[disease_key(disease)]
+
+
+# Urgency tiers, checked in order: (minimum total severity, minimum single symptom weight, tier)
+TRIAGE_TIERS = (
+    (20, 7, 'High'),
+    (12, 6, 'Medium'),
+    (0, 0, 'Low'),
+)
+
+
+def _symptom_key(name):
+    # Symptom-severity.csv spells a few symptoms without the stray spaces,
+    # and Training.csv has a duplicated fluid_overload column
+    return name.replace(' ', '').split('.')[0]
+
+
+def severity_weights(symptoms, path=SEVERITY_PATH):
+    """Build the severity weight vector for `symptoms` (in input column order) from Symptom-severity.csv."""
+    table = pd.read_csv(path)
+    weights = dict(zip(table['Symptom'].map(_symptom_key), table['weight'].astype(float)))
+    return np.array([weights.get(_symptom_key(name), 0.0) for name in symptoms])
+
+
+def triage(model, patient_symptoms):
+    """Score a symptom set by severity and return (score, urgency tier).
+
+    The score is the dot product of the weight vector with the symptom
+    vector, computed as a sum over the selected symptoms only.
+    """
+    indices = [model.symptoms_dict[item] for item in patient_symptoms]
+    if not indices:
+        return 0.0, TRIAGE_TIERS[-1][2]
+    selected = model.severity[indices]
+    score, peak = float(selected.sum()), float(selected.max())
+    for min_score, min_weight, tier in TRIAGE_TIERS:
+        if score >= min_score or (min_weight and peak >= min_weight):
+            return score, tier
+
+
+def encode_symptom_table(model, table):
+    """Encode every row of a Symptom_1..Symptom_N table into one 0/1 matrix.
+
+    Symptom names are looked up for all cells at once; blank cells and names
+    outside the model's vocabulary are ignored.
+    """
+    columns = [c for c in table.columns if c.startswith('Symptom')]
+    cells = table[columns].to_numpy(dtype=object).ravel()
+    codes = pd.Series(cells, dtype=object).str.strip().map(model.symptoms_dict).to_numpy()
+
+    found = ~pd.isna(codes)
+    rows = np.repeat(np.arange(len(table)), len(columns))[found]
+    X = np.zeros((len(table), len(model.symptoms_dict)), dtype=np.uint8)
+    X[rows, codes[found].astype(np.intp)] = 1
+    return X
+
+
+def score_symptom_sets(model, index, data, chunksize=10000):
+    """Predict diseases for a DataFrame (or CSV path) of Symptom_1..Symptom_N rows.
+
+    Each chunk is encoded in one vectorized pass and scored with a single
+    predict_classes call, so every row gets the disease get_predicted_value
+    would give it. Returns the input rows with the predicted disease, its
+    recommendation fields and the severity triage.
+    """
+    if isinstance(data, pd.DataFrame):
+        chunks = (data.iloc[i:i + chunksize] for i in range(0, len(data), chunksize))
+    else:
+        chunks = pd.read_csv(data, chunksize=chunksize)
+
+    results = []
+    for chunk in chunks:
+        X = encode_symptom_table(model, chunk)
+        predicted = pd.Series(predict_classes(model, X), index=chunk.index).map(model.diseases_list)
+        records = pd.DataFrame(
+            [get_recommendation(index, disease) for disease in predicted],
+            columns=Recommendation._fields, index=chunk.index,
+        )
+        severity = X @ model.severity
+        peak = (X * model.severity).max(axis=1)
+        scored = chunk.assign(Predicted=predicted).join(records)
+        scored['Severity'] = severity
+        scored['Urgency'] = _urgency_tiers(severity, peak)
+        results.append(scored)
+
+    return pd.concat(results) if results else pd.DataFrame()
+
+
+def _urgency_tiers(severity, peak):
+    conditions = [
+        (severity >= min_score) | ((peak >= min_weight) if min_weight else False)
+        for min_score, min_weight, _ in TRIAGE_TIERS
+    ]
+    return np.select(conditions, [tier for _, _, tier in TRIAGE_TIERS], default=TRIAGE_TIERS[-1][2])
+
+
+def main():
+    # Rebuild datasets/recommendations.json from the recommendation CSVs
+    index = build_recommendation_index(
+        pd.read_csv(asset_path("datasets", "description.csv")),
+        pd.read_csv(asset_path("datasets", "precautions_df.csv")),
+        pd.read_csv(asset_path("datasets", "medications.csv")),
+        pd.read_csv(asset_path("datasets", "diets.csv")),
+        pd.read_csv(asset_path("datasets", "workout_df.csv")),
+    )
+    save_recommendation_index(index)
+    print(f"Wrote {len(index)} disease records to {RECOMMENDATIONS_PATH}")
+
+
+if __name__ == '__main__':
+    main()
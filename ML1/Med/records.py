@@ -0,0 +1,64 @@
+import os
+
+import blob_store
+import db
+from assets import BASE_DIR
+
+# Medical records: rows in medical_data plus the uploaded files they point to.
+# Files live in the content-addressed blob store, and a blob's reference count
+# is the number of medical_data rows with its content_hash. Blobs are written
+# and removed while holding the database write lock, so an upload and a delete
+# of the same content can't race each other.
+
+
+def stored_path(digest, root=blob_store.BLOB_DIR):
+    """The file_path recorded for a blob: relative to the app directory, with forward slashes."""
+    return os.path.relpath(blob_store.blob_path(digest, root), BASE_DIR).replace(os.sep, '/')
+
+
+def local_path(file_path):
+    """Resolve a medical_data.file_path on this machine.
+
+    Rows from before the blob store hold paths relative to the app directory
+    with Windows separators, so both separators are accepted.
+    """
+    return os.path.normpath(os.path.join(BASE_DIR, *file_path.replace('\\', '/').split('/')))
+
+
+def save_uploads(username, uploaded_files, path=db.DB_PATH, root=blob_store.BLOB_DIR):
+    """Store uploaded files and record them for `username` in one commit.
+
+    Identical content is stored only once, however many times or by however
+    many users it is uploaded. Returns the content hash of each file.
+    """
+    staged = []
+    try:
+        # Hashing and writing happen before the transaction, so other
+        # sessions aren't locked out while a large file is written
+        for uploaded_file in uploaded_files:
+            staged.append((uploaded_file,) + blob_store.write_temp(uploaded_file.getbuffer(), root))
+
+        with db.transaction(path) as conn:
+            db.insert_records(conn, [
+                (username, f.name, f.type, stored_path(digest, root), size, digest)
+                for f, _, digest, size in staged
+            ])
+            for _, tmp_path, digest, _ in staged:
+                blob_store.commit(tmp_path, digest, root)
+    finally:
+        for _, tmp_path, _, _ in staged:
+            blob_store.discard(tmp_path)
+    return [digest for _, _, digest, _ in staged]
+
+
+def delete_record(username, record_id, path=db.DB_PATH, root=blob_store.BLOB_DIR):
+    """Delete one of the user's records, removing its file once no record uses it.
+
+    Not offered on the Reports page yet: that page trusts whatever username is
+    picked from the dropdown, so deletion has to wait until it is tied to the
+    logged-in Dashboard session.
+    """
+    with db.transaction(path) as conn:
+        digest = db.delete_record(conn, username, record_id)
+        if digest is not None and db.count_references(conn, digest) == 0:
+            blob_store.remove(digest, root)
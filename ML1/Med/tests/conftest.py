@@ -0,0 +1,6 @@
+import os
+import sys
+
+# The app's modules are imported as top-level modules (Streamlit runs from
+# ML1/Med), so put that directory on the path for the tests too.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,95 @@
+import itertools
+
+import numpy as np
+import pytest
+
+import clinical_models
+
+
+def reference_flags(Glucose, Insulin, BMI):
+    """The diabetes form's original if/elif chain, kept as the specification."""
+    NewBMI_Underweight = 0
+    NewBMI_Overweight = 0
+    NewBMI_Obesity_1 = 0
+    NewBMI_Obesity_2 = 0
+    NewBMI_Obesity_3 = 0
+    NewInsulinScore_Normal = 0
+    NewGlucose_Low = 0
+    NewGlucose_Normal = 0
+    NewGlucose_Overweight = 0
+    NewGlucose_Secret = 0
+
+    if float(BMI) <= 18.5:
+        NewBMI_Underweight = 1
+    elif 18.5 < float(BMI) <= 24.9:
+        pass
+    elif 24.9 < float(BMI) <= 29.9:
+        NewBMI_Overweight = 1
+    elif 29.9 < float(BMI) <= 34.9:
+        NewBMI_Obesity_1 = 1
+    elif 34.9 < float(BMI) <= 39.9:
+        NewBMI_Obesity_2 = 1
+    elif float(BMI) > 39.9:
+        NewBMI_Obesity_3 = 1
+
+    if 16 <= float(Insulin) <= 166:
+        NewInsulinScore_Normal = 1
+
+    if float(Glucose) <= 70:
+        NewGlucose_Low = 1
+    elif 70 < float(Glucose) <= 99:
+        NewGlucose_Normal = 1
+    elif 99 < float(Glucose) <= 126:
+        NewGlucose_Overweight = 1
+    elif float(Glucose) > 126:
+        NewGlucose_Secret = 1
+
+    return [
+        NewBMI_Underweight, NewBMI_Overweight, NewBMI_Obesity_1, NewBMI_Obesity_2,
+        NewBMI_Obesity_3, NewInsulinScore_Normal, NewGlucose_Low, NewGlucose_Normal,
+        NewGlucose_Overweight, NewGlucose_Secret,
+    ]
+
+
+def around(edges):
+    """Every bin edge plus the nearest floats on either side of it."""
+    return sorted({v for edge in edges for v in (np.nextafter(edge, -np.inf), edge, np.nextafter(edge, np.inf))})
+
+
+BMI_VALUES = around([18.5, 24.9, 29.9, 34.9, 39.9]) + [0.0, 22.0, 60.0, float('nan')]
+GLUCOSE_VALUES = around([70, 99, 126]) + [0.0, 85.0, 200.0, float('nan')]
+INSULIN_VALUES = around([16, 166]) + [0.0, 80.0, 900.0, float('nan')]
+
+
+def make_row(glucose, insulin, bmi):
+    # Pregnancies, Glucose, BloodPressure, SkinThickness, Insulin, BMI, DiabetesPedigreeFunction, Age
+    return [2, glucose, 72, 20, insulin, bmi, 0.5, 40]
+
+
+def test_matches_reference_at_bin_edges():
+    cases = list(itertools.product(GLUCOSE_VALUES, INSULIN_VALUES, BMI_VALUES))
+    rows = np.array([make_row(*case) for case in cases])
+
+    features = clinical_models.diabetes_features(rows)
+
+    assert features.shape == (len(cases), 18)
+    np.testing.assert_array_equal(features[:, :8], rows)
+    expected = np.array([reference_flags(*case) for case in cases], dtype=float)
+    np.testing.assert_array_equal(features[:, 8:], expected)
+
+
+@pytest.mark.parametrize('column', ['Glucose', 'Insulin', 'BMI'])
+def test_missing_value_sets_no_flag(column):
+    values = {'Glucose': 85.0, 'Insulin': 80.0, 'BMI': 22.0, column: float('nan')}
+    features = clinical_models.diabetes_features(make_row(values['Glucose'], values['Insulin'], values['BMI']))
+
+    flags = dict(zip(clinical_models.DIABETES_FLAG_COLUMNS, features[0, 8:]))
+    groups = {'Glucose': 'NewGlucose_', 'Insulin': 'NewInsulinScore_', 'BMI': 'NewBMI_'}
+    assert all(v == 0 for name, v in flags.items() if name.startswith(groups[column]))
+
+
+def test_single_row_and_batch_agree():
+    rows = np.array([make_row(g, i, b) for g, i, b in [(60, 10, 17), (100, 100, 31), (130, 200, 45)]])
+    batch = clinical_models.diabetes_features(rows)
+    for row, expected in zip(rows, batch):
+        np.testing.assert_array_equal(clinical_models.diabetes_features(row)[0], expected)
@@ -0,0 +1,92 @@
+import sqlite3
+
+import pytest
+
+import migrations
+
+
+LEGACY_USERS = [
+    ('neha', 'first', 21, 50, 160),
+    ('sam', 'pw', 30, 70, 180),
+    ('neha', 'second', 22, 55, 165),
+    ('neha', 'third', 23, 60, 170),
+]
+
+
+@pytest.fixture
+def legacy_db(tmp_path):
+    """A user_data.db as the app created it before migrations existed."""
+    conn = sqlite3.connect(tmp_path / 'user_data.db')
+    conn.execute("CREATE TABLE users (username TEXT, password TEXT, age INTEGER, weight INTEGER, height INTEGER)")
+    conn.execute("CREATE TABLE medical_data (username TEXT, file_name TEXT, file_type TEXT, file_path TEXT)")
+    conn.executemany("INSERT INTO users VALUES (?, ?, ?, ?, ?)", LEGACY_USERS)
+    conn.commit()
+    yield conn
+    conn.close()
+
+
+def test_duplicate_usernames_are_renamed_not_deleted(legacy_db):
+    migrations.migrate(legacy_db)
+
+    users = legacy_db.execute("SELECT username, password FROM users ORDER BY rowid").fetchall()
+    assert users == [('neha', 'first'), ('sam', 'pw'), ('neha#3', 'second'), ('neha#4', 'third')]
+    with pytest.raises(sqlite3.IntegrityError):
+        legacy_db.execute("INSERT INTO users (username) VALUES ('sam')")
+
+
+def schema(conn):
+    return conn.execute("SELECT type, name, sql FROM sqlite_master ORDER BY name").fetchall()
+
+
+def test_migrate_is_idempotent(legacy_db):
+    legacy_db.execute("INSERT INTO medical_data VALUES ('neha', 'scan.jpeg', 'image/jpeg', 'uploaded_files\\scan.jpeg')")
+    legacy_db.commit()
+
+    assert migrations.migrate(legacy_db) == len(migrations.MIGRATIONS)
+    before = schema(legacy_db), legacy_db.execute("SELECT * FROM medical_data").fetchall()
+
+    assert migrations.migrate(legacy_db) == len(migrations.MIGRATIONS)
+    assert (schema(legacy_db), legacy_db.execute("SELECT * FROM medical_data").fetchall()) == before
+    assert not legacy_db.in_transaction
+
+
+def test_legacy_records_keep_their_data(legacy_db):
+    legacy_db.execute("INSERT INTO medical_data VALUES ('neha', 'scan.jpeg', 'image/jpeg', 'uploaded_files\\scan.jpeg')")
+    legacy_db.commit()
+    migrations.migrate(legacy_db)
+
+    row = legacy_db.execute(
+        "SELECT id, username, file_name, file_type, file_path, file_size, content_hash, uploaded_at FROM medical_data"
+    ).fetchone()
+    assert row[:7] == (1, 'neha', 'scan.jpeg', 'image/jpeg', 'uploaded_files\\scan.jpeg', None, None)
+    assert row[7]
+
+
+def test_new_database_gets_current_schema(tmp_path):
+    conn = sqlite3.connect(tmp_path / 'new.db')
+    assert migrations.migrate(conn) == len(migrations.MIGRATIONS)
+    assert migrations.schema_version(conn) == len(migrations.MIGRATIONS)
+    conn.close()
+
+
+def test_failed_migration_leaves_version_unchanged(legacy_db, monkeypatch):
+    def broken(conn):
+        conn.execute("CREATE TABLE half_done (x)")
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(migrations, 'MIGRATIONS', migrations.MIGRATIONS[:1] + [broken])
+    with pytest.raises(RuntimeError):
+        migrations.migrate(legacy_db)
+
+    assert migrations.schema_version(legacy_db) == 1
+    assert not legacy_db.execute("SELECT 1 FROM sqlite_master WHERE name = 'half_done'").fetchone()
+
+
+def test_records_listing_is_index_only(legacy_db):
+    migrations.migrate(legacy_db)
+    plan = legacy_db.execute('''EXPLAIN QUERY PLAN
+        SELECT id, file_name, file_type, file_path, file_size, uploaded_at
+        FROM medical_data WHERE username = ? ORDER BY uploaded_at DESC, id DESC LIMIT 20''', ('neha',)).fetchall()
+    assert [detail for *_, detail in plan] == [
+        'SEARCH medical_data USING COVERING INDEX medical_data_username_uploaded_at (username=?)'
+    ]
@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("cv2")
+pytest.importorskip("PIL")
+
+import cv2
+from PIL import Image
+
+import pneumonia
+from assets import asset_path
+
+XRAY_PATH = asset_path("uploaded_files", "test.jpeg")
+
+
+def baseline_input(path):
+    # The page's original getResult preprocessing
+    image = cv2.imread(path)
+    image = Image.fromarray(image, 'RGB')
+    image = image.resize((128, 128))
+    return np.expand_dims(np.array(image), axis=0)
+
+
+def read_bytes(path):
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def test_preprocess_matches_baseline():
+    expected = baseline_input(XRAY_PATH)
+    actual = pneumonia.preprocess(read_bytes(XRAY_PATH))
+    assert actual.dtype == np.float32
+    np.testing.assert_array_equal(actual, expected)
+
+
+def test_batch_decoding_matches_single(monkeypatch):
+    seen = []
+
+    class Model:
+        def predict_on_batch(self, inputs):
+            seen.append(inputs.copy())
+            return np.tile([0.25, 0.75], (len(inputs), 1))
+
+    monkeypatch.setattr(pneumonia, 'get_runtime', Model)
+    data = read_bytes(XRAY_PATH)
+    classes, confidences = pneumonia.predict_batch([data, data, data], batch_size=2)
+
+    np.testing.assert_array_equal(classes, [1, 1, 1])
+    np.testing.assert_allclose(confidences, 0.75)
+    inputs = np.concatenate(seen)
+    for row in inputs:
+        np.testing.assert_array_equal(row, baseline_input(XRAY_PATH)[0])
+
+
+def test_undecodable_upload():
+    with pytest.raises(ValueError):
+        pneumonia.preprocess(b'not an image')
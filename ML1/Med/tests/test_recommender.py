@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import recommender
+from assets import asset_path
+from model_registry import load_model
+from train_symptom_model import load_training_data
+
+
+@pytest.fixture(scope='module')
+def model():
+    return recommender.load_symptom_model()
+
+
+@pytest.fixture(scope='module')
+def index():
+    return load_model(recommender.RECOMMENDATIONS_PATH, loader=recommender.read_recommendation_index)
+
+
+def symptom_sets(model):
+    table = pd.read_csv(asset_path("datasets", "symtoms_df.csv"))
+    X = recommender.encode_symptom_table(model, table)
+    names = np.array(list(model.symptoms_dict))
+    return [list(names[row.astype(bool)]) for row in np.unique(X[X.any(axis=1)], axis=0)]
+
+
+def test_top_k_leads_with_the_prediction(model, index):
+    for symptoms in symptom_sets(model):
+        top = recommender.get_top_k(model, index, symptoms, k=3)
+        assert top[0][0] == recommender.get_predicted_value(model, symptoms)
+        scores = [score for _, score, _ in top]
+        assert scores == sorted(scores, reverse=True)
+
+
+def test_top_k_returns_scores_and_recommendations(model, index):
+    top = recommender.get_top_k(model, index, ['skin_rash', 'chills', 'joint_pain', 'vomiting'], k=41)
+    assert len(top) == 41
+    total = sum(score for _, score, _ in top)
+    if model.calibrated:
+        assert total == pytest.approx(1)
+    else:
+        # one vote per pair of diseases
+        assert total == 41 * 40 // 2
+    for disease, _, rec in top:
+        assert rec == recommender.get_recommendation(index, disease)
+
+
+def test_uncalibrated_ranking_agrees_with_predict(model):
+    if model.calibrated:
+        pytest.skip("the deployed model ranks by probability")
+    X, *_ = load_training_data()
+    X = np.unique(np.vstack([X, recommender.encode_symptom_table(
+        model, pd.read_csv(asset_path("datasets", "symtoms_df.csv")))]), axis=0)
+    assert (recommender.predict_classes(model, X) == model.classifier.predict(X)).all()
+
+
+def test_batch_scoring_matches_single_predictions(model, index):
+    table = pd.read_csv(asset_path("datasets", "symtoms_df.csv"))
+    columns = [c for c in table.columns if c.startswith('Symptom')]
+    extra = pd.DataFrame([
+        [' skin_rash', 'itching ', '', None],
+        ['', '', '', ''],
+        ['  high_fever', None, ' chills', 'vomiting'],
+    ], columns=columns)
+    table = pd.concat([table, extra], ignore_index=True)
+
+    scored = recommender.score_symptom_sets(model, index, table, chunksize=1000)
+    assert len(scored) == len(table)
+    for cells, row in zip(table[columns].itertuples(index=False), scored.itertuples()):
+        names = (c.strip() for c in cells if isinstance(c, str))
+        symptoms = list(dict.fromkeys(n for n in names if n in model.symptoms_dict))
+        severity, urgency = recommender.triage(model, symptoms)
+        assert row.Predicted == recommender.get_predicted_value(model, symptoms)
+        assert row.Severity == pytest.approx(severity)
+        assert row.Urgency == urgency
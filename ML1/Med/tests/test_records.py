@@ -0,0 +1,76 @@
+import io
+import os
+
+import pytest
+
+import blob_store
+import db
+import records
+
+
+class Upload:
+    """The parts of Streamlit's UploadedFile that records.save_uploads uses."""
+
+    def __init__(self, name, data, type='application/pdf'):
+        self.name = name
+        self.type = type
+        self._data = io.BytesIO(data)
+
+    def getbuffer(self):
+        return self._data.getbuffer()
+
+
+@pytest.fixture
+def store(tmp_path):
+    path = str(tmp_path / 'user_data.db')
+    root = str(tmp_path / 'blobs')
+    yield path, root
+    db.close_all()
+
+
+def blob_files(root):
+    return sorted(name for _, _, names in os.walk(root) for name in names)
+
+
+def test_identical_uploads_share_one_blob(store):
+    path, root = store
+    data = os.urandom(3 * blob_store.CHUNK_SIZE + 17)
+
+    first = records.save_uploads('alice', [Upload('report.pdf', data)], path, root)
+    second = records.save_uploads('bob', [Upload('report.pdf', data), Upload('notes.pdf', b'notes')], path, root)
+
+    assert first[0] == second[0]
+    assert blob_files(root) == sorted({first[0], second[1]})
+    (record,) = db.list_records('alice', path)
+    assert record.file_size == len(data)
+    with open(records.local_path(record.file_path), 'rb') as f:
+        assert f.read() == data
+
+
+def test_blob_removed_with_last_reference(store):
+    path, root = store
+    data = b'%PDF-1.4 lab report'
+    (digest,) = records.save_uploads('alice', [Upload('a.pdf', data)], path, root)
+    records.save_uploads('bob', [Upload('b.pdf', data)], path, root)
+
+    records.delete_record('alice', db.list_records('alice', path)[0].id, path, root)
+    assert os.path.exists(blob_store.blob_path(digest, root))
+
+    records.delete_record('bob', db.list_records('bob', path)[0].id, path, root)
+    assert not os.path.exists(blob_store.blob_path(digest, root))
+
+
+def test_delete_ignores_other_users_records(store):
+    path, root = store
+    (digest,) = records.save_uploads('alice', [Upload('a.pdf', b'data')], path, root)
+
+    records.delete_record('mallory', db.list_records('alice', path)[0].id, path, root)
+
+    assert len(db.list_records('alice', path)) == 1
+    assert os.path.exists(blob_store.blob_path(digest, root))
+
+
+def test_no_temporary_files_left_behind(store):
+    path, root = store
+    records.save_uploads('alice', [Upload('a.pdf', b'one'), Upload('b.pdf', b'one')], path, root)
+    assert not [name for name in blob_files(root) if name.endswith('.tmp')]
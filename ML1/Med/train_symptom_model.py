@@ -0,0 +1,127 @@
+import argparse
+import hashlib
+import os
+import pickle
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.metrics import accuracy_score, log_loss
+from sklearn.model_selection import train_test_split
+from sklearn.svm import SVC
+
+import recommender
+from assets import asset_path
+
+# Train the Medicine page's symptom classifier from datasets/Training.csv.
+# The 0/1 training matrix is cached bit-packed next to the CSV, and the model
+# is written as a versioned artifact that embeds its symptom and disease
+# vocabularies, so the page never needs hand-maintained lookup tables.
+#
+#   python train_symptom_model.py
+#
+# An already fitted classifier can be packaged instead of training a new one,
+# which is how the originally deployed pages/svc.pkl was converted:
+#
+#   python train_symptom_model.py --package svc.pkl
+
+TRAINING_PATH = asset_path("datasets", "Training.csv")
+PACKED_PATH = asset_path("datasets", "Training.packed.npz")
+
+
+def pack_training_data(csv_path=TRAINING_PATH, packed_path=PACKED_PATH):
+    """Convert Training.csv into bit-packed symptoms plus uint8 disease labels."""
+    data = pd.read_csv(csv_path)
+    symptoms = [c for c in data.columns if c != 'prognosis']
+    diseases, labels = np.unique(data['prognosis'], return_inverse=True)
+
+    np.savez(
+        packed_path,
+        bits=np.packbits(data[symptoms].to_numpy(dtype=np.uint8), axis=1),
+        labels=labels.astype(np.uint8),
+        symptoms=np.array(symptoms),
+        diseases=diseases.astype(str),
+    )
+
+
+def load_training_data(csv_path=TRAINING_PATH, packed_path=PACKED_PATH):
+    """Return (X, y, symptoms, diseases), repacking the CSV only when it changed."""
+    if not os.path.exists(packed_path) or os.path.getmtime(packed_path) < os.path.getmtime(csv_path):
+        pack_training_data(csv_path, packed_path)
+
+    with np.load(packed_path) as packed:
+        symptoms = packed['symptoms'].tolist()
+        X = np.unpackbits(packed['bits'], axis=1, count=len(symptoms))
+        return X, packed['labels'], symptoms, packed['diseases'].tolist()
+
+
+def create_model(X, y):
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y, test_size=0.2, random_state=42
+    )
+
+    # probability=True has libsvm fit Platt scaling on cross-validated
+    # decision values, so predict_proba gives calibrated probabilities at
+    # about the cost of predict(). The page ranks diseases by those
+    # probabilities, so accuracy is measured on their argmax too.
+    model = SVC(kernel='linear', probability=True, random_state=42)
+    model.fit(X_train, y_train)
+    probabilities = model.predict_proba(X_test)
+    print('Accuracy of our model: ', accuracy_score(y_test, model.classes_[probabilities.argmax(axis=1)]))
+    print('Log loss of its probabilities: ', log_loss(y_test, probabilities, labels=model.classes_))
+
+    # The deployed model is trained on every row
+    return model.fit(X, y)
+
+
+def read_classifier(path, symptoms, diseases):
+    """Load a classifier pickled elsewhere, checking it was fitted on Training.csv's columns and labels."""
+    with open(path, 'rb') as f:
+        model = pickle.load(f)
+    if model.n_features_in_ != len(symptoms) or len(model.classes_) != len(diseases):
+        raise SystemExit(f"{path} was not fitted on {len(symptoms)} symptoms and {len(diseases)} diseases")
+    if hasattr(model, 'feature_names_in_'):
+        if list(model.feature_names_in_) != symptoms:
+            raise SystemExit(f"{path} was fitted on a different symptom column order")
+        # The page passes plain arrays, so keeping the names would only warn
+        # on every prediction; the artifact's symptom list replaces them
+        del model.feature_names_in_
+    return model
+
+
+def file_hash(path):
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the symptom classifier used by the Medicine page.")
+    parser.add_argument('--output', default=recommender.SYMPTOM_MODEL_PATH)
+    parser.add_argument('--package', metavar='PICKLE',
+                        help="package this fitted classifier with the vocabularies instead of training one")
+    args = parser.parse_args()
+
+    X, y, symptoms, diseases = load_training_data()
+    if args.package:
+        model = read_classifier(args.package, symptoms, diseases)
+        # what it was trained on isn't recorded, so only its own hash is kept
+        data_hash, source = None, f"{os.path.basename(args.package)} sha256:{file_hash(args.package)}"
+    else:
+        model = create_model(X, y)
+        data_hash, source = file_hash(TRAINING_PATH), None
+    version = time.strftime('%Y%m%d%H%M%S', time.gmtime())
+
+    recommender.save_symptom_model({
+        'version': version,
+        'training_sha256': data_hash,
+        'source': source,
+        'classifier': model,
+        'symptoms': symptoms,
+        'diseases': diseases,
+        'severity': recommender.severity_weights(symptoms),
+    }, args.output)
+    print(f"Wrote symptom model version {version} to {args.output}")
+
+
+if __name__ == '__main__':
+    main()